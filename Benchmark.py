@@ -0,0 +1,608 @@
+"""
+Author:                 Nathan Dunne
+Date last modified:     18/10/2026
+Purpose:                Time stages of the program on generated tweets, without needing twitter access.
+Convention:             This program adheres to the PEP8 Python programming convention throughout.
+"""
+#!/usr/bin/python
+
+import TwitterInterface  # The local class used for fetching and cleaning tweets.
+import FileGenerator  # The local class used for generating files.
+import TweetColumns  # The local class used for holding observations as typed columns.
+import SentimentAnalysis  # The local class used for sentiment analysis.
+import SentimentCache  # The local class used for remembering the sentiment of already analysed tweets.
+import LexiconSentiment  # The local class used for scoring batches of tweets with TextBlob's lexicon and NumPy.
+import DataFrameDisplayFormat  # The local class used for making, formatting and displaying data frames.
+import argparse  # Required for parsing the benchmark and parameters passed in from a console.
+import random  # Required for generating tweet texts.
+import re  # Required for the previous tweet cleaning, which is timed for comparison.
+import time  # Required for timing each benchmark.
+import os  # Required for measuring the size of written files.
+import tempfile  # Required for writing benchmark files to a temporary directory.
+import contextlib  # Required for hiding the progress printed by the timed functions.
+import io  # Required for hiding the progress printed by the timed functions.
+import csv  # Required for the previous csv writing, which is timed for comparison.
+import json  # Required for the previous json writing, which is timed for comparison, and storing results.
+import platform  # Required for recording the python version results were taken with.
+import subprocess  # Required for labelling results with the git revision they were taken at, and timing imports.
+import sys  # Required for running the program in a new python process when checking import times.
+from datetime import datetime, timedelta  # Required for generating tweet times.
+
+# Words, mentions, links and non-ASCII characters the generated tweet texts are made up of.
+tweet_words = ["good", "bad", "great", "terrible", "okay", "love", "hate", "not", "very", "really", "the", "a", "is",
+               "automation", "robots", "jobs", "future", "today", "#AI", "RT", "it's", "can't", "!!", "?", "&amp;"]
+tweet_extras = ["@user", "@Some_Account", "https://t.co/AbCdEf123", "http://example.com/a?b=c", "café", "naïve",
+                "\U0001F600", "\U0001F525\U0001F525", "—", "\n"]
+
+
+def main():
+    """
+    main() runs the benchmark named in the parameters. Parameters: string(benchmark), int(--tweets), int(--repeat)
+    """
+    arguments = parseArguments()
+
+    benchmarks = {'normaliser': benchmarkNormaliser,
+                  'formats': benchmarkFormats,
+                  'pipeline': benchmarkPipeline,
+                  'imports': benchmarkImports,
+                  'scorers': benchmarkScorers}
+
+    benchmarks[arguments.benchmark](arguments)
+
+
+def parseArguments():
+    """
+    parseArguments() reads the benchmark to run and its parameters from the argument vector.
+    """
+    parser = argparse.ArgumentParser(description="Time stages of the program on generated tweets.")
+
+    parser.add_argument("benchmark", choices=['normaliser', 'formats', 'pipeline', 'imports', 'scorers'],
+                        help="The benchmark to run.")
+    parser.add_argument("--tweets", type=int, default=100000, help="Amount of tweets to generate (default: 100000).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each timing, the best is kept (default: 3).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for generating tweets (default: 0).")
+
+    # Options of the pipeline benchmark.
+    parser.add_argument("--scales", type=lambda scales: [int(scale) for scale in scales.split(",")],
+                        default=[1000, 10000, 100000, 1000000],
+                        help="Comma separated amounts of tweets the pipeline is timed at (default: "
+                             "1000,10000,100000,1000000).")
+    parser.add_argument("--duplicates", type=float, default=0.2,
+                        help="Share of tweets repeating the text of an earlier tweet, like retweets (default: 0.2).")
+    parser.add_argument("--geo", type=float, default=0.05,
+                        help="Share of tweets with a place and coordinates (default: 0.05).")
+    parser.add_argument("--sentiment-limit", type=int, default=20000,
+                        help="Most tweets sentiment analysis is timed on at each scale, as TextBlob takes about a "
+                             "millisecond a tweet. Larger scales report the rate of this many (default: 20000).")
+    parser.add_argument("--results", default="benchmarkResults.jsonl",
+                        help="JSON lines file pipeline results are appended to and compared against "
+                             "(default: benchmarkResults.jsonl).")
+    parser.add_argument("--label", default=None,
+                        help="Label of the results, e.g. a version (default: the git revision).")
+
+    # Options of the imports benchmark.
+    parser.add_argument("--max-import-ms", type=float, default=200,
+                        help="Most milliseconds importing main.py may take before the imports check fails "
+                             "(default: 200).")
+
+    # Options of the scorers benchmark.
+    parser.add_argument("--min-agreement", type=float, default=100.0,
+                        help="Least percentage of labels the lexicon scorer must share with TextBlob before the "
+                             "scorers check fails (default: 100).")
+
+    return parser.parse_args()
+
+
+def generateTweetTexts(amount_of_tweets, seed=0, duplicate_rate=0.0):
+    """
+    generateTweetTexts() returns a list of raw tweet texts made up of words, mentions, links, emoji and other non-ASCII
+    characters. A duplicate_rate share of the texts repeat an earlier text, as retweets and copied tweets do.
+    """
+    generator = random.Random(seed)
+
+    tweet_texts = []
+
+    for index in range(amount_of_tweets):
+        if index > 0 and duplicate_rate > 0 and generator.random() < duplicate_rate:
+            tweet_texts.append(tweet_texts[generator.randrange(index)])
+            continue
+
+        words = generator.choices(tweet_words, k=generator.randint(5, 25))
+        words += generator.choices(tweet_extras, k=generator.randint(0, 4))
+        generator.shuffle(words)
+
+        tweet_texts.append(" ".join(words))
+
+    return tweet_texts
+
+
+def generateObservations(amount_of_tweets, seed=0, duplicate_rate=0.0, geo_rate=0.05):
+    """
+    generateObservations() returns a list of observation dictionaries, as fetched, with generated and cleaned texts.
+    """
+    return list(iterateObservations(
+        TwitterInterface.TwitterInterface.clean_tweet_texts(generateTweetTexts(amount_of_tweets, seed, duplicate_rate)),
+        seed, geo_rate))
+
+
+def iterateObservations(tweet_texts, seed=0, geo_rate=0.05):
+    """
+    iterateObservations() yields an observation dictionary, as fetched, for each cleaned tweet text. A geo_rate share
+    of the tweets have a place and coordinates.
+    """
+    generator = random.Random(seed)
+
+    start_time = datetime(2018, 11, 16, 12, 0, 0)
+
+    for index, tweet_text in enumerate(tweet_texts):
+        has_place = generator.random() < geo_rate  # Few tweets have geo data.
+
+        yield {'created_at': str(start_time + timedelta(seconds=index // 3)),
+               'text': tweet_text,
+               'favorite_count': int(generator.paretovariate(1.5)) - 1,
+               'retweet_count': int(generator.paretovariate(2)) - 1,
+               'tweet_id': str(1063000000000000000 + index),
+               'self_favorited': False,
+               'self_retweeted': False,
+               'lang': "en",
+               'place': generator.choice(["Dublin", "London", "Texas"]) if has_place else "noPlaceData",
+               'coordinates': ("[{}, {}]".format(round(generator.uniform(-10, 10), 4),
+                                                 round(generator.uniform(40, 60), 4))
+                               if has_place else "noCoordinatesData"),
+               'in_reply_to_user_id': "noInReplyToUseridData",
+               'in_reply_to_status_id': "noInReplyToStatusidData"}
+
+
+def timeBest(function, repeat):
+    """
+    timeBest() calls a function an amount of times and returns the fastest wall time in seconds, with its result.
+    """
+    best_time = None
+    result = None
+
+    for run in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+
+        if best_time is None or elapsed < best_time:
+            best_time = elapsed
+
+    return best_time, result
+
+
+def timeQuiet(function, repeat):
+    """
+    timeQuiet() is timeBest() with the progress printed by the timed function hidden.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return timeBest(function, repeat)
+
+
+def previousCleanTweetText(tweet):
+    """
+    previousCleanTweetText() is how tweets were cleaned before the single pass normaliser, kept here for comparison:
+    the text was turned into the string of its utf-8 bytes, then cleaned with an uncompiled pattern, split and joined.
+    """
+    tweet = str(tweet.encode("utf-8"))[1:]
+
+    return ' '.join(re.sub(r"(@[A-Za-z0-9]+)|([^0-9A-Za-z \t])|(\w+:\/\/\S+)", " ", tweet).split())
+
+
+def benchmarkNormaliser(arguments):
+    """
+    benchmarkNormaliser() compares the previous tweet cleaning with the single pass normaliser, one tweet at a time and
+    as a batch.
+    """
+    tweet_texts = generateTweetTexts(arguments.tweets, arguments.seed)
+
+    interface = TwitterInterface.TwitterInterface
+
+    print("Cleaning " + str(len(tweet_texts)) + " generated tweets, best of " + str(arguments.repeat) + " runs.")
+
+    timings = [("Previous (utf-8 repr + re.sub)",) + timeBest(
+                   lambda: [previousCleanTweetText(tweet) for tweet in tweet_texts], arguments.repeat),
+               ("clean_tweet_text per tweet",) + timeBest(
+                   lambda: [interface.clean_tweet_text(tweet) for tweet in tweet_texts], arguments.repeat),
+               ("clean_tweet_texts batch",) + timeBest(
+                   lambda: interface.clean_tweet_texts(tweet_texts), arguments.repeat)]
+
+    previous_time = timings[0][1]
+
+    for name, elapsed, cleaned_texts in timings:
+        print("{:<32} {:>8.3f}s {:>12.0f} tweets/s {:>6.2f}x".format(name, elapsed, len(tweet_texts) / elapsed,
+                                                                     previous_time / elapsed))
+
+    # The previous cleaning left the letters of escaped non-ASCII characters behind, e.g. "xf0 x9f x98 x80".
+    previous_words = sum(len(cleaned_text.split()) for cleaned_text in timings[0][2])
+    normalised_words = sum(len(cleaned_text.split()) for cleaned_text in timings[2][2])
+
+    print("Words kept: previous {}, normaliser {}".format(previous_words, normalised_words))
+
+
+def previousCreateCSV(tweets, filename):
+    """
+    previousCreateCSV() is how csv files were written before batching, one row at a time, kept here for comparison.
+    """
+    with open(filename+".csv", 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(tweets[0])
+
+        for each_tweet in tweets:
+            writer.writerow(each_tweet.values())
+
+
+def previousCreateJSON(tweets, filename):
+    """
+    previousCreateJSON() is how json files were written before, with one json.dump() of the whole list.
+    """
+    with open(filename+".json", 'w') as outfile:
+        json.dump(tweets, outfile)
+
+
+def benchmarkFormats(arguments):
+    """
+    benchmarkFormats() writes generated tweets in each file format and reports the write time and file size.
+    Formats whose optional library is not installed are reported as skipped.
+    """
+    tweets = TweetColumns.TweetColumns(generateObservations(arguments.tweets, arguments.seed))
+    tweet_list = list(tweets)  # The previous writers need a list of dictionaries.
+
+    file_generator = FileGenerator.FileGenerator()
+
+    print("Writing " + str(len(tweets)) + " generated tweets, best of " + str(arguments.repeat) + " runs.")
+    print("{:<24} {:>9} {:>14} {:>12}".format("Format", "Time", "Tweets/s", "Size (MB)"))
+
+    with tempfile.TemporaryDirectory() as directory:
+        writers = [("csv (previous, per row)", "csv",
+                    lambda name: previousCreateCSV(tweet_list, file_generator.fileName(name, 'csv'))),
+                   ("json (previous, dump)", "json",
+                    lambda name: previousCreateJSON(tweet_list, file_generator.fileName(name, 'json')))]
+
+        for file_format in file_generator.file_formats:
+            writers.append((file_format, file_format, lambda name, file_format=file_format:
+                            file_generator.createFiles(tweets, name, [file_format])))
+
+        for name, file_format, writer in writers:
+            filename = os.path.join(directory, "benchmark")
+            path = file_generator.fileName(filename, file_format) + "." + file_format
+
+            if os.path.exists(path):
+                os.remove(path)
+
+            with contextlib.redirect_stdout(io.StringIO()):  # Hide the "Creating ... file" progress.
+                elapsed, result = timeBest(lambda: writer(filename), arguments.repeat)
+
+            if not os.path.exists(path):  # The optional library for the format is not installed.
+                print("{:<24} {:>9}".format(name, "skipped"))
+                continue
+
+            print("{:<24} {:>8.3f}s {:>14.0f} {:>12.2f}".format(name, elapsed, len(tweets) / elapsed,
+                                                                os.path.getsize(path) / 1000000))
+
+
+def benchmarkPipeline(arguments):
+    """
+    benchmarkPipeline() times each stage of the program on generated tweets at each scale: cleaning, sentiment
+    analysis, writing csv and json files and formatting the data frame. The results are appended to the results file
+    with a label, and compared with the most recent results of a different label, so regressions between versions show.
+    """
+    label = arguments.label or gitRevision()
+
+    previous_results = readBenchmarkResults(arguments.results, label)
+
+    print("Timing the pipeline on generated tweets, best of " + str(arguments.repeat) + " runs, labelled " + label +
+          ", with " + str(round(arguments.duplicates * 100)) + "% duplicate texts.")
+    print("{:>8} {:<28} {:>9} {:>14} {:>9}".format("Tweets", "Stage", "Time", "Tweets/s", "Change"))
+
+    results = []
+
+    for scale in arguments.scales:
+        raw_texts = generateTweetTexts(scale, arguments.seed, arguments.duplicates)
+
+        interface = TwitterInterface.TwitterInterface
+
+        timings = [("clean_tweet_text", scale) + timeQuiet(
+                       lambda: [interface.clean_tweet_text(tweet) for tweet in raw_texts], arguments.repeat)]
+
+        tweets = TweetColumns.TweetColumns(iterateObservations(timings[0][3], arguments.seed, arguments.geo))
+        del raw_texts
+
+        data_display_format = DataFrameDisplayFormat.DataFrameDisplayFormat()
+        data_frame = data_display_format.convertDataSetToDataFrame(tweets)
+
+        # TextBlob is slow, so sentiment analysis is timed on up to the sentiment limit of tweets at larger scales.
+        sample_size = min(scale, arguments.sentiment_limit)
+        sample_texts = tweets.text[:sample_size]
+        sample_frame = data_frame.head(sample_size)
+
+        SentimentAnalysis.SentimentAnalysis.analyseSentiment("warm up")  # Load TextBlob before timing.
+
+        timings.append(("analyseSentiment", sample_size) + timeQuiet(
+            lambda: [SentimentAnalysis.SentimentAnalysis.analyseSentiment(tweet) for tweet in sample_texts], 1))
+
+        # The lexicon scorer is quick enough to time on every tweet.
+        lexicon_analysis = SentimentAnalysis.SentimentAnalysis(scorer='lexicon')
+        lexicon_analysis.scoreTweets(["warm up"])  # Build the lookup tables before timing.
+
+        timings.append(("lexicon scoreTweets", scale) + timeQuiet(
+            lambda: lexicon_analysis.scoreTweets(tweets.text), arguments.repeat))
+
+        # displaySentimentPercentages with a fresh cache, which skips the repeated texts.
+        timings.append(("displaySentimentPercentages", sample_size) + timeQuiet(
+            lambda: SentimentAnalysis.SentimentAnalysis(cache=SentimentCache.SentimentCache()).
+            displaySentimentPercentages(sample_frame), 1))
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "benchmark")
+
+            timings.append(("createCSV", scale) + timeQuiet(
+                lambda: FileGenerator.FileGenerator.createCSV(tweets, filename), arguments.repeat))
+            timings.append(("createJSON", scale) + timeQuiet(
+                lambda: FileGenerator.FileGenerator.createJSON(tweets, filename), arguments.repeat))
+
+        timings.append(("formatDataFrame", scale) + timeQuiet(
+            lambda: data_display_format.formatDataFrame(data_frame, 10), arguments.repeat))
+
+        for stage, timed_tweets, elapsed, result in timings:
+            result = {'label': label,
+                      'date': datetime.now().isoformat(timespec='seconds'),
+                      'python': platform.python_version(),
+                      'stage': stage,
+                      'scale': scale,
+                      'tweets_timed': timed_tweets,
+                      'seconds': elapsed,
+                      'tweets_per_second': timed_tweets / elapsed}
+            results.append(result)
+
+            previous_result = previous_results.get((stage, scale))
+            change = ""
+
+            if previous_result is not None:  # Above 1.00x is faster than the previous label, below is slower.
+                change = "{:.2f}x".format(result['tweets_per_second'] / previous_result['tweets_per_second'])
+
+            print("{:>8} {:<28} {:>8.3f}s {:>14.0f} {:>9}".format(scale, stage, elapsed,
+                                                                  result['tweets_per_second'], change))
+
+        del tweets, data_frame, sample_frame
+
+    with open(arguments.results, 'a') as results_file:
+        for result in results:
+            results_file.write(json.dumps(result) + "\n")
+
+    print("Appended " + str(len(results)) + " results to " + arguments.results)
+
+
+def generateLexiconTexts(amount_of_tweets, seed=0, lexicon_words=True):
+    """
+    generateLexiconTexts() returns a list of cleaned texts made up of words of TextBlob's lexicon, modifiers, words
+    ending in "ly", negations and short unknown words, so that every modifier and negation rule is met often.
+    If lexicon_words is False the texts are made up of only negations and unknown words, which score as neutral.
+    """
+    generator = random.Random(seed)
+
+    tables = LexiconSentiment.LexiconSentiment.lookupTables()
+
+    words = [word for word, row in tables['word_rows'].items() if word.isalnum() and row != tables['negation_row']]
+    modifiers = [word for word in words if tables['modifier'][tables['word_rows'][word]]]
+    ly_modifiers = [word for word in modifiers if word.endswith("ly")]
+
+    word_groups = [words, modifiers, ly_modifiers, ["no", "not", "never"], ["a", "i", "is", "to", "an", "u", "2"],
+                   ["the", "cat", "house", "automation", "robots"]]
+
+    if not lexicon_words:
+        word_groups = word_groups[3:]
+
+    return [" ".join(generator.choice(generator.choice(word_groups)) for word in range(generator.randint(0, 15)))
+            for index in range(amount_of_tweets)]
+
+
+def scoreInBatches(sentiment_analysis, texts, batch_size=None):
+    """
+    scoreInBatches() scores a list of texts batch_size texts at a time, or all at once if batch_size is None.
+    """
+    if batch_size is None:
+        return sentiment_analysis.scoreTweets(texts)
+
+    return [label for start in range(0, len(texts), batch_size)
+            for label in sentiment_analysis.scoreTweets(texts[start:start + batch_size])]
+
+
+def benchmarkScorers(arguments):
+    """
+    benchmarkScorers() checks that the lexicon scorer gives the same labels as TextBlob, on generated tweets and on
+    texts made up to meet every modifier and negation rule, and compares how many tweets a second each scores.
+    TextBlob is slow, so at most --sentiment-limit texts of each are checked. Exits with status 1 if the labels agree
+    less than --min-agreement percent of the time, so it can be run as a regression check.
+    """
+    sample_size = min(arguments.tweets, arguments.sentiment_limit)
+
+    # Each corpus is scored in batches of its batch size, None scoring it all at once. Batches with no lexicon words,
+    # and batches of a single text, reach the scorer too when streaming with a cache or a small chunk size.
+    corpora = [("generated tweets", [observation['text'] for observation in
+                                     generateObservations(sample_size, arguments.seed, arguments.duplicates)], None),
+               ("lexicon rules", generateLexiconTexts(sample_size, arguments.seed), None),
+               ("no lexicon words", generateLexiconTexts(sample_size, arguments.seed, lexicon_words=False), 100),
+               ("single texts", generateLexiconTexts(min(sample_size, 2000), arguments.seed + 1), 1)]
+
+    textblob_analysis = SentimentAnalysis.SentimentAnalysis(scorer='textblob')
+    lexicon_analysis = SentimentAnalysis.SentimentAnalysis(scorer='lexicon')
+
+    lexicon_analysis.scoreTweets(["warm up"])  # Build the lookup tables and import TextBlob before timing.
+
+    print("Scoring " + str(sample_size) + " texts of each corpus, best of " + str(arguments.repeat) + " runs.")
+    print("{:<18} {:>14} {:>14} {:>9} {:>11}".format("Corpus", "TextBlob/s", "Lexicon/s", "Speedup", "Agreement"))
+
+    failed = False
+
+    for name, texts, batch_size in corpora:
+        textblob_time, textblob_labels = timeBest(lambda: textblob_analysis.scoreTweets(texts), 1)
+        lexicon_time, lexicon_labels = timeBest(lambda: scoreInBatches(lexicon_analysis, texts, batch_size),
+                                                arguments.repeat)
+
+        agreeing = sum(1 for textblob_label, lexicon_label in zip(textblob_labels, lexicon_labels)
+                       if textblob_label == lexicon_label)
+        agreement = agreeing * 100 / max(len(texts), 1)
+
+        print("{:<18} {:>14.0f} {:>14.0f} {:>8.1f}x {:>10.3f}%".format(name, len(texts) / textblob_time,
+                                                                       len(texts) / lexicon_time,
+                                                                       textblob_time / lexicon_time, agreement))
+
+        if agreement < arguments.min_agreement:
+            failed = True
+
+            disagreements = [(text, textblob_label, lexicon_label) for text, textblob_label, lexicon_label
+                             in zip(texts, textblob_labels, lexicon_labels) if textblob_label != lexicon_label]
+
+            for text, textblob_label, lexicon_label in disagreements[:10]:  # A few examples to start looking from.
+                print("    TextBlob {} lexicon {}: {}".format(textblob_label, lexicon_label, text))
+
+    # The lexicon scorer at the full amount of tweets.
+    tweet_texts = [observation['text'] for observation in
+                   generateObservations(arguments.tweets, arguments.seed, arguments.duplicates)]
+    lexicon_time, lexicon_labels = timeBest(lambda: lexicon_analysis.scoreTweets(tweet_texts), arguments.repeat)
+
+    print("Lexicon scorer on " + str(len(tweet_texts)) + " generated tweets: {:.3f}s, {:.0f} tweets/s".format(
+        lexicon_time, len(tweet_texts) / lexicon_time))
+
+    if failed:
+        print("FAILED: the lexicon scorer agrees with TextBlob less than " + str(arguments.min_agreement) + "%")
+        sys.exit(1)
+
+    print("Scorer checks passed.")
+
+
+# Libraries that are slow to import and must only be imported by the stage that uses them.
+heavy_modules = ['pandas', 'numpy', 'tabulate', 'textblob', 'nltk', 'tweepy']
+
+# Libraries a files-only run of the CSV and JSON files must never import, parquet and feather files are written with
+# pandas.
+files_only_excluded_modules = ['pandas', 'tabulate', 'textblob']
+
+
+def benchmarkImports(arguments):
+    """
+    benchmarkImports() checks that importing main.py stays quick and loads none of the heavy libraries, and that a
+    files-only run replaying generated tweets to CSV and JSON files never imports pandas, tabulate or textblob. Each
+    is run in a new python process with -X importtime. Exits with status 1 if a check fails, so it can be run as a
+    regression check.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    failures = []
+
+    # Importing main.py, as a run with bad arguments does before it prints its error.
+    import_times = [importTimes(["-c", "import main"], directory) for run in range(arguments.repeat)]
+    main_import_ms = min(each_import_times['main'] for each_import_times in import_times)
+
+    print("Importing main.py: {:.1f}ms".format(main_import_ms))
+
+    if main_import_ms > arguments.max_import_ms:
+        failures.append("importing main.py took {:.1f}ms, more than {}ms".format(main_import_ms,
+                                                                                arguments.max_import_ms))
+
+    loaded_modules = [module for module in heavy_modules if module in import_times[0]]
+
+    if len(loaded_modules) > 0:
+        failures.append("importing main.py imports " + ", ".join(loaded_modules))
+
+    # A files-only run of generated tweets to CSV and JSON files, replayed from a recorded json file.
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        recorded_filename = os.path.join(temporary_directory, "recorded")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            FileGenerator.FileGenerator.createJSON(generateObservations(arguments.tweets, arguments.seed),
+                                                   recorded_filename)
+
+        import_times = importTimes([os.path.join(directory, "main.py"), "Benchmark", str(arguments.tweets), "0",
+                                    "--replay", recorded_filename + ".json", "--files-only", "--formats", "csv,json"],
+                                   temporary_directory)
+
+    loaded_modules = [module for module in files_only_excluded_modules if module in import_times]
+
+    print("Files-only run of " + str(arguments.tweets) + " tweets imports: " +
+          (", ".join(module for module in heavy_modules if module in import_times) or "no heavy libraries"))
+
+    if len(loaded_modules) > 0:
+        failures.append("a files-only run imports " + ", ".join(loaded_modules))
+
+    for failure in failures:
+        print("FAILED: " + failure)
+
+    if len(failures) > 0:
+        sys.exit(1)
+
+    print("Import checks passed.")
+
+
+def importTimes(python_arguments, directory):
+    """
+    importTimes() runs python with the arguments and -X importtime in a directory, and returns the cumulative
+    milliseconds each top level module took to import, by module name. Modules imported by other modules are counted
+    in their importer's time, but are included too so their being loaded at all can be checked.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime"] + python_arguments, capture_output=True,
+                               text=True, cwd=directory, env=dict(os.environ, PYTHONPATH=directory))
+
+    if completed.returncode != 0:
+        raise RuntimeError("python " + " ".join(python_arguments) + " failed:\n" + completed.stderr[-2000:])
+
+    import_times = {}
+
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        self_time, cumulative_time, module = line[len("import time:"):].split("|")
+
+        if not cumulative_time.strip().isdigit():  # The header line.
+            continue
+
+        # Only the first time a module is imported is listed, a module further in is a part of its importer.
+        import_times.setdefault(module.strip(), int(cumulative_time) / 1000)
+
+    return import_times
+
+
+def readBenchmarkResults(filename, label):
+    """
+    readBenchmarkResults() returns the most recent result of each (stage, scale) in the results file taken with a
+    label other than the given one, or an empty dictionary if there is no results file yet.
+    """
+    previous_results = {}
+
+    if not os.path.exists(filename):
+        return previous_results
+
+    with open(filename) as results_file:
+        for line in results_file:
+            if not line.strip():
+                continue
+
+            result = json.loads(line)
+
+            if result['label'] != label:  # Later lines are more recent, so they replace earlier ones.
+                previous_results[(result['stage'], result['scale'])] = result
+
+    return previous_results
+
+
+def gitRevision():
+    """
+    gitRevision() returns the short git revision of the working copy, marked if it has changes, or "unlabelled" if git
+    is not available.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))  # The revision of the program, wherever it is run from.
+
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  check=True, cwd=directory).stdout.strip()
+        changes = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                                 text=True, check=True, cwd=directory).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unlabelled"
+
+    return revision + ("-modified" if changes else "")
+
+
+if __name__ == "__main__":
+    main()
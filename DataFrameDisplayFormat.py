@@ -1,15 +1,17 @@
 """
 Author:                 Nathan Dunne
-Date last modified:     16/11/2018
+Date last modified:     18/10/2026
 Purpose:                Create a data frame from a data set, format and sort said data frame and display
                         data frame as a table.
 """
 
-import pandas  # The pandas library is used to create, format and sort a data frame.
+# The pandas library is used to create, format and sort a data frame. It is imported when a data frame is made, so
+# runs that only fetch tweets and write files do not pay for importing it.
 # BSD 3-Clause License
 # Copyright (c) 2008-2012, AQR Capital Management, LLC, Lambda Foundry, Inc. and PyData Development
 
-from tabulate import tabulate  # The tabulate library is used to better display the pandas data frame as a table.
+# The tabulate library is used to better display the pandas data frame as a table. It is imported when a table is
+# displayed.
 # MIT License Copyright (c) 2018 Sergey Astanin
 
 
@@ -20,17 +22,23 @@ class DataFrameDisplayFormat:
     @staticmethod  # Method is static as it alters no values of the self object.
     def convertDataSetToDataFrame(data_set):
         """
-        Convert a data set to a pandas data frame.
+        Convert a data set to a pandas data frame. Typed columns build the data frame straight from their arrays.
         """
 
+        if hasattr(data_set, 'toDataFrame'):  # TweetColumns build their own typed data frame.
+            return data_set.toDataFrame()
+
+        import pandas
+
         data_frame = pandas.DataFrame(data_set)  # Convert the data set (List of dictionaries) to a pandas data frame.
 
         return data_frame
 
     @staticmethod  # Method is static as it alters no values of the self object.
-    def formatDataFrame(data_frame):
+    def formatDataFrame(data_frame, top_k=None):
         """
-        Format and sort a data frame.
+        Format and sort a data frame. If top_k is given only that amount of the highest ranked rows are selected and
+        sorted, in the same order the full sort would put them in, rather than sorting every row.
         """
 
         data_frame = data_frame[['favorite_count',  # Order and display only these three columns.
@@ -38,6 +46,12 @@ class DataFrameDisplayFormat:
                                  'text',
                                  ]]
 
+        if top_k is not None:
+            print("\nSelecting top " + str(top_k) + " rows by 'favorite_count', 'retweet_count', descending.")
+
+            # Partially select the top rows, keeping the first of equal rows as the full sort does.
+            return data_frame.nlargest(top_k, ['favorite_count', 'retweet_count'], keep='first')
+
         print("\nSorting data by 'favorite_count', 'retweet_count', descending.")
 
         # Sort the rows first by favorite count and then by retweet count in descending order.
@@ -50,6 +64,7 @@ class DataFrameDisplayFormat:
         """
         Display a data frame in table format using tabulate.
         """
+        from tabulate import tabulate
 
         # Print out an amount of rows from the data frame, possibly with showing the index, with the headers as the
         # data frame headers using the table format of PostgreSQL.
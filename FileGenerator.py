@@ -1,20 +1,79 @@
 """
 Author:                 Nathan Dunne
-Date last modified:     16/11/2018
-Purpose:                Generate a csv and json file from a data set.
+Date last modified:     18/10/2026
+Purpose:                Generate csv, json, compressed json lines, parquet and feather files from a data set, or append
+                        to them as tweets are streamed in.
 """
 
 import csv  # Python has a built in csv library we can use to create a csv file
 import json  # Python has a built in json library we can use to create a json file.
+import gzip  # Python has a built in gzip library we can use to compress json lines files.
+from functools import partial  # Required for setting the gzip compression level of the compress function.
+from itertools import islice  # Required for writing tweets to a csv file in batches.
 
 
 class FileGenerator:
 
+    # The file formats that can be created, and the part of them that can be appended to as tweets are streamed in.
+    file_formats = ['csv', 'json', 'jsonl', 'jsonl.gz', 'jsonl.zst', 'parquet', 'feather']
+    appendable_formats = ['csv', 'jsonl', 'jsonl.gz', 'jsonl.zst']
+
     def __init__(self):
         pass  # There is nothing to initialise so pass is called here. The pass statement is a null operation.
 
     @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
-    def createCSV(tweets, filename):
+    def fileName(search_term, file_format):
+        """
+        Name the file of a search term in a file format, without the file extension.
+        """
+        if file_format == 'csv':
+            return search_term + "twitterDataCSV"
+        elif file_format in ('parquet', 'feather'):
+            return search_term + "twitterData" + file_format.capitalize()
+        else:  # json and every json lines format.
+            return search_term + "twitterDataJSON"
+
+    def createFiles(self, tweets, search_term, file_formats):
+        """
+        Create a file of the tweets of a search term in each of the file formats. Returns the names of the files made.
+        """
+        file_creators = {'csv': self.createCSV,
+                         'json': self.createJSON,
+                         'jsonl': self.createJSONLines,
+                         'jsonl.gz': lambda tweets, filename: self.createJSONLines(tweets, filename, 'gzip'),
+                         'jsonl.zst': lambda tweets, filename: self.createJSONLines(tweets, filename, 'zstd'),
+                         'parquet': self.createParquet,
+                         'feather': self.createFeather}
+
+        file_names = []
+
+        for file_format in file_formats:
+            filename = self.fileName(search_term, file_format)
+
+            if file_creators[file_format](tweets, filename) is not False:  # False means the file could not be made.
+                file_names.append(filename + "." + file_format)
+
+        return file_names
+
+    def appendFiles(self, tweets, search_term, file_formats, start_file):
+        """
+        Append a batch of tweets of a search term to a file in each of the file formats that can be appended to.
+        If start_file is True the files are started over.
+        """
+        for file_format in file_formats:
+            filename = self.fileName(search_term, file_format)
+
+            if file_format == 'csv':
+                self.appendCSV(tweets, filename, start_file)
+            elif file_format == 'jsonl':
+                self.appendJSONLines(tweets, filename, start_file)
+            elif file_format == 'jsonl.gz':
+                self.appendJSONLines(tweets, filename, start_file, 'gzip')
+            elif file_format == 'jsonl.zst':
+                self.appendJSONLines(tweets, filename, start_file, 'zstd')
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def createCSV(tweets, filename, batch_size=1000):
         print("\nCreating CSV file: " + filename)
 
         headers = tweets[0]  # Use an index of the list, which has the dictionary keys, as the headers.
@@ -24,13 +83,142 @@ class FileGenerator:
             writer = csv.writer(csv_file)  # Instantiate the writer object.
             writer.writerow(headers)  # Write the first row using the headers.
 
-            for each_tweet in tweets:  # For each dictionary object (tweet data) in the list (of tweet data sets)
-                # Write the values of the dictionary object (tweet data) as a new row.
-                writer.writerow(each_tweet.values())
+            if hasattr(tweets, 'rowValues'):  # TweetColumns convert a batch of rows a column at a time.
+                for start in range(0, len(tweets), batch_size):
+                    writer.writerows(tweets.rowValues(start, start + batch_size))
+                return
+
+            each_tweet_values = (each_tweet.values() for each_tweet in tweets)
+
+            # Write the values of the dictionary objects (tweet data) as new rows, a batch of rows at a time.
+            batch = list(islice(each_tweet_values, batch_size))
+
+            while len(batch) > 0:
+                writer.writerows(batch)
+                batch = list(islice(each_tweet_values, batch_size))
 
     @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
     def createJSON(tweets, filename):
         print("Creating JSON file: " + filename)
 
+        # Write the list one tweet at a time, rather than building the whole json document in memory first.
         with open(filename+".json", 'w') as outfile:
-            json.dump(tweets, outfile)
+            outfile.write("[")
+
+            for index, each_tweet in enumerate(tweets):
+                if index > 0:
+                    outfile.write(", ")  # The same separator json.dump() puts between list items.
+
+                outfile.write(json.dumps(each_tweet))
+
+            outfile.write("]")
+
+    @classmethod  # Method is a class method as it uses the other static methods but no values of the self object.
+    def createJSONLines(cls, tweets, filename, compression=None):
+        """
+        Create a json lines file, one json object per line, possibly compressed with 'gzip' or 'zstd'.
+        """
+        print("Creating JSON lines file: " + filename)
+
+        return cls.appendJSONLines(tweets, filename, True, compression)
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def appendCSV(tweets, filename, start_file):
+        """
+        Append a batch of tweets to a csv file. If start_file is True the file is started over and the headers written.
+        The file is closed after each batch so that everything appended so far is on disk if the program stops.
+        """
+        if len(tweets) == 0 and not start_file:  # Nothing to append.
+            return
+
+        with open(filename+".csv", 'w' if start_file else 'a', newline='') as csv_file:
+
+            writer = csv.writer(csv_file)  # Instantiate the writer object.
+
+            if start_file and len(tweets) > 0:
+                writer.writerow(tweets[0])  # Write the first row using the dictionary keys as the headers.
+
+            writer.writerows(each_tweet.values() for each_tweet in tweets)  # Write each tweet as a new row.
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def appendJSONLines(tweets, filename, start_file, compression=None, batch_size=1000):
+        """
+        Append a batch of tweets to a json lines file, one json object per line, so that the file can be appended to
+        and read back one tweet at a time. If start_file is True the file is started over.
+        With compression 'gzip' or 'zstd' each batch of lines is compressed on its own and appended. Both formats
+        read a file of appended compressed parts back as one, so a stopped program still leaves a readable file.
+        Returns False if the file could not be made.
+        """
+        extension = {None: ".jsonl", 'gzip': ".jsonl.gz", 'zstd': ".jsonl.zst"}[compression]
+
+        if compression == 'zstd':
+            try:
+                import zstandard  # Only needed for zstd files, so it is not required to run the program.
+            except ImportError:
+                print("The zstandard library is required for zstd files: pip install zstandard")
+                return False
+
+            compress = zstandard.ZstdCompressor().compress
+        elif compression == 'gzip':
+            compress = partial(gzip.compress, compresslevel=6)  # Quicker than the default level, 9.
+        else:
+            compress = None
+
+        with open(filename+extension, 'wb' if start_file else 'ab') as outfile:
+            each_tweet_line = (json.dumps(each_tweet) + "\n" for each_tweet in tweets)
+
+            # Encode, and possibly compress, a batch of lines at a time.
+            batch = "".join(islice(each_tweet_line, batch_size))
+
+            while len(batch) > 0:
+                data = batch.encode("utf-8")
+                outfile.write(data if compress is None else compress(data))
+
+                batch = "".join(islice(each_tweet_line, batch_size))
+
+    @classmethod  # Method is a class method as it uses the other static methods but no values of the self object.
+    def createParquet(cls, tweets, filename):
+        """
+        Create a parquet file, a compressed columnar format for analytics. Returns False if it could not be made.
+        """
+        print("Creating Parquet file: " + filename)
+
+        data_frame = cls.columnarDataFrame(tweets, "Parquet")
+
+        if data_frame is None:
+            return False
+
+        data_frame.to_parquet(filename+".parquet", index=False)
+
+    @classmethod  # Method is a class method as it uses the other static methods but no values of the self object.
+    def createFeather(cls, tweets, filename):
+        """
+        Create a feather (arrow) file, a columnar format that is fast to write and read. Returns False if it could not
+        be made.
+        """
+        print("Creating Feather file: " + filename)
+
+        data_frame = cls.columnarDataFrame(tweets, "Feather")
+
+        if data_frame is None:
+            return False
+
+        data_frame.to_feather(filename+".feather")
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def columnarDataFrame(tweets, format_name):
+        """
+        Return the tweets as a data frame to write to a columnar file, or None if pyarrow, which pandas uses to write
+        columnar files, is not installed.
+        """
+        try:
+            import pyarrow  # Only needed for columnar files, so it is not required to run the program.
+            import pandas
+        except ImportError:
+            print("The pyarrow library is required for " + format_name + " files: pip install pyarrow")
+            return None
+
+        if hasattr(tweets, 'toDataFrame'):  # TweetColumns build their own typed data frame.
+            return tweets.toDataFrame()
+
+        return pandas.DataFrame(list(tweets))
@@ -0,0 +1,168 @@
+"""
+Author:                 Nathan Dunne
+Date last modified:     18/10/2026
+Purpose:                Count the sentiment of tweets per place and per cell of a longitude/latitude grid, and display
+                        the regions with the most tweets.
+"""
+
+import math  # Required for rounding coordinates down to the grid cell they are in.
+
+from TweetColumns import TweetColumns  # Used for reading the coordinates and place of observation dictionaries.
+
+
+class GeoSentiment:
+
+    # The grid divides the world into cells of this many degrees of longitude and latitude, numbered row by row from
+    # the south west corner. TweetStore keeps the cell of each tweet, so it must use the same grid.
+    grid_degrees = 1.0
+    grid_columns = int(360 / grid_degrees)
+    grid_rows = int(180 / grid_degrees)
+
+    # A sentiment label is the position of its count in each list of positive, neutral and negative counts.
+    sentiment_offsets = {1: 0, 0: 1, -1: 2}
+
+    def __init__(self, region=None):
+        """
+        region is an optional (min_longitude, min_latitude, max_longitude, max_latitude) box, only tweets with
+        coordinates in it are counted per grid cell. Places are counted whatever the region.
+        """
+        self.region = region
+
+        # Place name, or grid cell number -> the amount of positive, neutral and negative tweets.
+        self.places = {}
+        self.cells = {}
+
+    @classmethod  # Method is a class method as it uses the grid size but no values of the self object.
+    def gridCell(cls, longitude, latitude):
+        """
+        Return the number of the grid cell a longitude and latitude are in, or None if there are no coordinates.
+        """
+        if longitude is None or latitude is None or longitude != longitude or latitude != latitude:  # None or NaN.
+            return None
+
+        # The east and north edges of the world belong to the last column and row.
+        column = min(int(math.floor((longitude + 180) / cls.grid_degrees)), cls.grid_columns - 1)
+        row = min(int(math.floor((latitude + 90) / cls.grid_degrees)), cls.grid_rows - 1)
+
+        return max(row, 0) * cls.grid_columns + max(column, 0)
+
+    @classmethod  # Method is a class method as it uses the grid size but no values of the self object.
+    def cellBounds(cls, cell):
+        """
+        Return the (min_longitude, min_latitude, max_longitude, max_latitude) box of a grid cell.
+        """
+        row, column = divmod(cell, cls.grid_columns)
+
+        return (column * cls.grid_degrees - 180, row * cls.grid_degrees - 90,
+                (column + 1) * cls.grid_degrees - 180, (row + 1) * cls.grid_degrees - 90)
+
+    @classmethod  # Method is a class method as it uses the grid size but no values of the self object.
+    def regionCellRanges(cls, region):
+        """
+        Return the (first cell, last cell) ranges of each grid row a region overlaps, so the cells of a region can be
+        looked up a row at a time.
+        """
+        min_longitude, min_latitude, max_longitude, max_latitude = region
+
+        first_row, first_column = divmod(cls.gridCell(min_longitude, min_latitude), cls.grid_columns)
+        last_row, last_column = divmod(cls.gridCell(max_longitude, max_latitude), cls.grid_columns)
+
+        return [(row * cls.grid_columns + first_column, row * cls.grid_columns + last_column)
+                for row in range(first_row, last_row + 1)]
+
+    def inRegion(self, longitude, latitude):
+        """
+        Return whether a longitude and latitude are in the region, always True if there is no region.
+        """
+        if self.region is None:
+            return True
+
+        min_longitude, min_latitude, max_longitude, max_latitude = self.region
+
+        return min_longitude <= longitude <= max_longitude and min_latitude <= latitude <= max_latitude
+
+    def add(self, place, longitude, latitude, sentiment):
+        """
+        Add one tweet's sentiment to the counts of its place and grid cell. place is None, and longitude and latitude
+        None or NaN, where the tweet has none.
+        """
+        offset = self.sentiment_offsets[sentiment]
+
+        if place is not None:
+            counts = self.places.get(place)
+
+            if counts is None:
+                counts = self.places[place] = [0, 0, 0]
+
+            counts[offset] += 1
+
+        cell = self.gridCell(longitude, latitude)
+
+        if cell is not None and self.inRegion(longitude, latitude):
+            counts = self.cells.get(cell)
+
+            if counts is None:
+                counts = self.cells[cell] = [0, 0, 0]
+
+            counts[offset] += 1
+
+    def addTweets(self, tweets, sentiments):
+        """
+        Add a list of observation dictionaries, or TweetColumns, with the sentiment label of each tweet.
+        """
+        if hasattr(tweets, 'rowValues'):  # TweetColumns already hold a place code and numeric coordinates.
+            place_names = tweets.place_categories
+
+            for place_code, longitude, latitude, sentiment in zip(tweets.place, tweets.longitude, tweets.latitude,
+                                                                  sentiments):
+                self.add(place_names[place_code] if place_code >= 0 else None, longitude, latitude, sentiment)
+            return
+
+        no_place_values = TweetColumns.no_data_values['place']
+        no_coordinates_values = TweetColumns.no_data_values['coordinates']
+
+        for each_tweet, sentiment in zip(tweets, sentiments):
+            place = each_tweet['place']
+            coordinates = each_tweet['coordinates']
+
+            longitude, latitude = TweetColumns.parseCoordinates(None if coordinates in no_coordinates_values
+                                                                else coordinates)
+
+            self.add(None if place in no_place_values else place, longitude, latitude, sentiment)
+
+    def addCounts(self, places, cells):
+        """
+        Add counts already grouped by place and by grid cell, e.g. by TweetStore, as dictionaries of sentiment label
+        to amount by place name and by cell number.
+        """
+        for grouped_counts, counts_by_key in ((places, self.places), (cells, self.cells)):
+            for key, sentiment_counts in grouped_counts.items():
+                counts = counts_by_key.setdefault(key, [0, 0, 0])
+
+                for sentiment, amount in sentiment_counts.items():
+                    counts[self.sentiment_offsets[sentiment]] += amount
+
+    def displayGeoSentiment(self, amount_of_rows=10):
+        """
+        Display the sentiment percentages of the places and grid cells with the most tweets.
+        """
+        if len(self.places) == 0 and len(self.cells) == 0:
+            print("\nNo tweets with a place or coordinates.")
+            return
+
+        place_rows = [(place, counts) for place, counts in self.places.items()]
+        cell_rows = [("[{:g}, {:g}, {:g}, {:g}]".format(*self.cellBounds(cell)), counts)
+                     for cell, counts in self.cells.items()]
+
+        for title, rows in (("place", place_rows), ("grid cell [west, south, east, north]", cell_rows)):
+            if len(rows) == 0:
+                continue
+
+            print("\nSentiment per " + title + ", positive/neutral/negative %:")
+
+            # The regions with the most tweets first, then by name.
+            for name, counts in sorted(rows, key=lambda row: (-sum(row[1]), row[0]))[:amount_of_rows]:
+                total_amount = sum(counts)
+
+                print("{:<36} {:>7} {:>12}".format(name, total_amount, "/".join(
+                    "{:.0f}".format(amount * 100 / total_amount) for amount in counts)))
@@ -0,0 +1,217 @@
+"""
+Author:                 Nathan Dunne (with attributions)
+Date last modified:     18/10/2026
+Purpose:                Score the sentiment of whole batches of cleaned tweet texts with NumPy, using the same pattern
+                        lexicon, modifiers and negation rules as TextBlob, without building a TextBlob per tweet.
+"""
+
+import threading  # Required for building the lookup tables once when several threads analyse tweets at once.
+from itertools import chain  # Required for joining the words of a batch of tweets into one sequence.
+
+
+class LexiconSentiment:
+    """
+    TextBlob's default analyser, the pattern library's Sentiment, looks up each word of a text in a lexicon of
+    adjectives and adverbs. A known word is an assessment with a polarity. A known adverb (a modifier, e.g. "very")
+    multiplies the polarity of the known word after it by its intensity, and a negation ("no", "not", "never") turns
+    the polarity of the next assessment to -0.5 times itself. The polarity of the text is the mean of its assessments.
+    Code used in part and modified from:
+        https://github.com/sloria/TextBlob/blob/dev/src/textblob/_text.py
+    Copyright 2013-2018 Steven Loria, Copyright (c) 2011-2013 University of Antwerp, Belgium
+
+    The rules are applied here to a whole batch of texts at once as NumPy array operations on flat lookup tables of the
+    lexicon. Texts are expected to be cleaned tweet texts, runs of letters and numbers separated by spaces, which
+    TextBlob tokenises by splitting on spaces; emoticons and exclamation marks can not occur in them.
+    """
+
+    # Words that negate the next assessment, the same as TextBlob's.
+    negations = ("no", "not", "never", "n't")
+
+    # The lookup tables are built from TextBlob's lexicon the first time a batch is scored, then shared.
+    tables = None
+    tables_lock = threading.Lock()
+
+    def __init__(self, batch_size=10000):
+        """
+        batch_size is the amount of texts scored at a time, which bounds the memory used for the words of a batch.
+        """
+        self.batch_size = batch_size
+
+    @classmethod  # Method is a class method as the tables are shared by every LexiconSentiment object.
+    def lookupTables(cls):
+        """
+        Build, once, the flat lookup tables of TextBlob's lexicon: a dictionary from each single word to its row, and
+        arrays of the polarity, intensity, whether it is a modifier and whether it ends in "ly" of each row.
+        Negations are not in the lexicon, they map to the row after the last word.
+        """
+        if cls.tables is not None:
+            return cls.tables
+
+        with cls.tables_lock:
+            if cls.tables is None:
+                import numpy  # Only needed for the lexicon scorer, so it is not required to run the program.
+                from textblob.en import sentiment as pattern_sentiment  # The lexicon TextBlob's analyser uses.
+
+                if dict.__len__(pattern_sentiment) == 0:
+                    pattern_sentiment.load()  # The lexicon is lazily loaded from its xml file.
+
+                # Only single words can match a word of a cleaned text. The None part of speech is the average of
+                # every part of speech, which is what TextBlob uses for a string.
+                words = [word for word in dict.keys(pattern_sentiment) if len(word.split()) == 1]
+                scores = [dict.__getitem__(pattern_sentiment, word)[None] for word in words]
+
+                word_rows = {word: row for row, word in enumerate(words)}
+
+                for negation in cls.negations:
+                    word_rows[negation] = len(words)
+
+                cls.tables = {'word_rows': word_rows,
+                              'negation_row': len(words),
+                              'polarity': numpy.array([score[0] for score in scores] + [0.0]),
+                              'intensity': numpy.array([score[2] for score in scores] + [1.0]),
+                              'modifier': numpy.array(['RB' in dict.__getitem__(pattern_sentiment, word)
+                                                       for word in words] + [False]),
+                              'ends_ly': numpy.array([word.endswith("ly") for word in words] + [False])}
+
+        return cls.tables
+
+    def scoreTweets(self, tweets):
+        """
+        Return the -1/0/1 polarity label of each cleaned tweet text in a list, the same labels as
+        SentimentAnalysis.analyseSentiment() gives.
+        """
+        labels = []
+
+        for start in range(0, len(tweets), self.batch_size):
+            labels.extend(self.scoreBatch(tweets[start:start + self.batch_size]).tolist())
+
+        return labels
+
+    def scoreBatch(self, tweets):
+        """
+        Return a NumPy array of the -1/0/1 polarity label of each cleaned tweet text in a batch.
+        """
+        import numpy
+
+        tables = self.lookupTables()
+
+        tweet_words = [tweet.lower().split() for tweet in tweets]
+        words = list(chain.from_iterable(tweet_words))
+
+        tweet_amount = len(tweet_words)
+        word_amount = len(words)
+
+        if word_amount == 0:
+            return numpy.zeros(tweet_amount, dtype=numpy.int64)
+
+        # The tweet each word is in, and the position of the first word of that tweet.
+        word_lengths = numpy.fromiter(map(len, tweet_words), dtype=numpy.int64, count=tweet_amount)
+        tweet_of_word = numpy.repeat(numpy.arange(tweet_amount), word_lengths)
+        tweet_start = (numpy.cumsum(word_lengths) - word_lengths)[tweet_of_word]
+
+        # The lexicon row of each word, -1 for an unknown word.
+        word_rows = tables['word_rows']
+        rows = numpy.fromiter((word_rows.get(word, -1) for word in words), dtype=numpy.int64, count=word_amount)
+
+        negation = rows == tables['negation_row']
+        known = (rows >= 0) & ~negation
+
+        if not known.any():  # No word of the batch is an assessment, a negation on its own is neutral.
+            return numpy.zeros(tweet_amount, dtype=numpy.int64)
+        character_amount = numpy.fromiter(map(len, words), dtype=numpy.int64, count=word_amount)
+
+        polarity = tables['polarity'][rows]
+        intensity = tables['intensity'][rows]
+        modifier = known & tables['modifier'][rows]
+        ends_ly = known & tables['ends_ly'][rows]
+
+        positions = numpy.arange(word_amount)
+
+        # The position of the last known word before each word in the same tweet, -1 if there is none.
+        last_known = self.lastBefore(known, positions, tweet_start)
+        has_last_known = last_known >= 0
+        last_known_or_0 = numpy.where(has_last_known, last_known, 0)
+
+        # A modifier is kept across unknown words of up to 2 letters ("really is a good"). A modifier ending in "ly"
+        # takes a negation after it into the assessment it started ("really not good"), so is kept across it.
+        clears_modifier = ~known & (character_amount > 2)
+        clears_ly_modifier = clears_modifier & ~negation
+
+        modifier_cleared = self.anyBetween(clears_modifier, last_known_or_0, positions)
+        ly_modifier_cleared = self.anyBetween(clears_ly_modifier, last_known_or_0, positions)
+
+        last_known_ly = ends_ly[last_known_or_0]
+
+        # Whether a modifier is in effect before each word.
+        modified = (has_last_known & modifier[last_known_or_0] &
+                    ~numpy.where(last_known_ly, ly_modifier_cleared, modifier_cleared))
+
+        # A negation after a modifier ending in "ly" negates the assessment the modifier is a part of.
+        negates_modified = negation & modified & last_known_ly
+
+        # A negation is kept across unknown words of 1 letter ("not a good") until the next known word, unless it was
+        # taken by a modifier ending in "ly".
+        last_negation = self.lastBefore(negation, positions, tweet_start)
+        last_negation_or_0 = numpy.where(last_negation >= 0, last_negation, 0)
+
+        negation_cleared = self.anyBetween(~known & (character_amount > 1), last_negation_or_0, positions)
+
+        negated = ((last_negation > last_known) & ~negation_cleared & ~negates_modified[last_negation_or_0])
+
+        # Each known word not after a modifier starts an assessment, a known word after a modifier is added to it.
+        known_positions = numpy.flatnonzero(known)
+        starts = known & ~modified
+
+        assessment = numpy.cumsum(starts) - 1  # The assessment each word is a part of, up to that word.
+        assessment_amount = int(numpy.count_nonzero(starts))
+
+        # The intensity an assessment multiplies the next word by, inverted if the word was negated.
+        effective_intensity = numpy.where(negated, 1.0 / intensity, intensity)
+
+        # A modified word's polarity is multiplied by the intensity before it, limited to -1.0 to 1.0.
+        word_polarity = numpy.where(starts, polarity,
+                                    numpy.clip(polarity * effective_intensity[last_known_or_0], -1.0, 1.0))
+
+        # The polarity of an assessment is that of its last word.
+        known_assessment = assessment[known_positions]
+        assessment_polarity = numpy.zeros(assessment_amount)
+        last_of_assessment = numpy.flatnonzero(numpy.append(numpy.diff(known_assessment) != 0, True))
+        assessment_polarity[known_assessment[last_of_assessment]] = word_polarity[known_positions[last_of_assessment]]
+
+        # An assessment is negated if any of its words were, or a negation after a modifier was taken into it.
+        assessment_negated = numpy.zeros(assessment_amount, dtype=bool)
+        assessment_negated[known_assessment[negated[known_positions]]] = True
+        assessment_negated[assessment[negates_modified]] = True
+
+        # "not good" is slightly bad, "not bad" is slightly good.
+        assessment_polarity = numpy.where(assessment_negated, assessment_polarity * -0.5, assessment_polarity)
+
+        # bincount adds each tweet's assessments in order, the same sum TextBlob takes the mean of, so a polarity that
+        # is exactly 0 is found exactly as TextBlob finds it.
+        assessment_tweet = tweet_of_word[numpy.flatnonzero(starts)]
+        tweet_polarity = numpy.bincount(assessment_tweet, weights=assessment_polarity, minlength=tweet_amount)
+
+        return numpy.sign(tweet_polarity).astype(numpy.int64)
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def lastBefore(flags, positions, tweet_start):
+        """
+        Return, for each word, the position of the last flagged word before it in the same tweet, or -1.
+        """
+        import numpy
+
+        last_flagged = numpy.maximum.accumulate(numpy.where(flags, positions, -1))
+        last_before = numpy.concatenate(([-1], last_flagged[:-1]))
+
+        return numpy.where(last_before >= tweet_start, last_before, -1)
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def anyBetween(flags, after_positions, positions):
+        """
+        Return, for each word, whether a flagged word lies strictly between after_positions and the word.
+        """
+        import numpy
+
+        flagged_amount = numpy.concatenate(([0], numpy.cumsum(flags)))  # Flagged words before each position.
+
+        return flagged_amount[positions] - flagged_amount[after_positions + 1] > 0
@@ -0,0 +1,55 @@
+"""
+Author:                 Nathan Dunne
+Date last modified:     18/10/2026
+Purpose:                Share the twitter search rate limit between fetches of several search terms running at once.
+"""
+
+import threading  # Required for sharing the scheduler safely between fetching threads.
+import time  # Required for refilling tokens over time and waiting for them.
+
+
+class RateLimitScheduler:
+
+    def __init__(self, requests_per_window=180, window_seconds=900):
+        """
+        A token bucket holding one token per search request. The standard search endpoint allows 180 requests per
+        15 minute window, so the bucket starts full and refills at 180 tokens per 900 seconds.
+        """
+        self.capacity = requests_per_window
+        self.refill_rate = requests_per_window / window_seconds  # Tokens added per second.
+
+        self.tokens = float(requests_per_window)
+        self.last_refill = time.monotonic()
+
+        self.lock = threading.Lock()
+
+        # Counters of how many requests were made and how long fetches waited on the rate limit.
+        self.requests = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self):
+        """
+        Take a token for one search request, waiting until one is available if the bucket is empty.
+        Returns the seconds waited.
+        """
+        waited = 0.0
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+
+                # Add the tokens refilled since the last request, up to the capacity of the bucket.
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+                self.last_refill = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.requests += 1
+                    self.wait_seconds += waited
+                    return waited
+
+                time_until_token = (1 - self.tokens) / self.refill_rate
+
+            # Wait outside the lock so other threads can check the bucket in the meantime.
+            time.sleep(time_until_token)
+            waited += time_until_token
@@ -0,0 +1,137 @@
+"""
+Author:                 Nathan Dunne
+Date last modified:     18/10/2026
+Purpose:                Replay recorded tweets in place of fetching them from twitter, so the program can be run and
+                        timed without credentials or network access.
+"""
+
+# Raw status objects are parsed by tweepy in the same way as fetched tweets. It is imported only when a raw status is
+# replayed, as recorded observation dictionaries do not need it.
+# MIT License Copyright (c) 2013-2014 Joshua Roesslein
+
+import json  # Required for reading the recorded tweets.
+import time  # Required for replaying tweets at a simulated rate.
+
+from TwitterInterface import TwitterInterface  # Replayed tweets are cleaned the same way as fetched tweets.
+from TweetColumns import TweetColumns  # The local class used for holding replayed observations as typed columns.
+
+
+class ReplaySource:
+
+    # Recorded tweets are replayed in pages of this many tweets, like a search request.
+    tweets_per_page = 100
+
+    def __init__(self, filename, tweets_per_second=0, rate_limit_scheduler=None):
+        """
+        filename is either a json file made by FileGenerator.createJSON(), or a json lines file holding one tweet per
+        line, either a raw twitter status object or an observation dictionary like FileGenerator.appendJSONLines()
+        writes.
+        tweets_per_second is the rate tweets are replayed at to simulate the twitter API, 0 replays at full speed.
+        rate_limit_scheduler is an optional RateLimitScheduler, a token is taken from it before each page of tweets is
+        replayed, in the same way as before each search request when fetching.
+        """
+        self.filename = filename
+        self.tweets_per_second = tweets_per_second
+        self.rate_limit_scheduler = rate_limit_scheduler
+
+    def fetchTweets(self, search_term, amount_of_tweets, exclude_retweets, since_id=None):
+        """
+        Replay an amount of recorded tweets, possibly excluding retweets, and return them as typed columns of
+        observations in the same way as TwitterInterface.fetchTweets().
+        """
+
+        # Collect every observation dictionary yielded by streamTweets() into typed columns.
+        tweet_observations = TweetColumns(self.streamTweets(search_term, amount_of_tweets, exclude_retweets,
+                                                            since_id))
+
+        print("Replayed " + str(len(tweet_observations)) + " observations.")
+
+        return tweet_observations
+
+    def streamTweets(self, search_term, amount_of_tweets, exclude_retweets, since_id=None, max_id=None):
+        """
+        Replay an amount of recorded tweets, possibly excluding retweets, yielding each one as an observation
+        dictionary in the same way as TwitterInterface.streamTweets(). The recorded tweets stand in for the search
+        results of whichever search term is given. If since_id is given only tweets with a higher id are replayed,
+        and if max_id is given only tweets with an id up to and including it.
+        """
+        print("Replaying tweets for: " + search_term + " from " + self.filename)
+        print("\nReplaying " + str(amount_of_tweets) + " twitter observations...")
+
+        replay_start = time.monotonic()
+        tweet_amount = 0
+
+        for recorded_tweet in self.readRecordedTweets():
+            if tweet_amount >= amount_of_tweets:
+                break
+
+            tweet_observation = self.buildObservation(recorded_tweet, exclude_retweets)
+
+            if tweet_observation is None:  # The tweet was a retweet that is excluded.
+                continue
+
+            if since_id is not None and int(tweet_observation['tweet_id']) <= since_id:  # Fetched by an earlier run.
+                continue
+
+            if max_id is not None and int(tweet_observation['tweet_id']) > max_id:  # Newer than the range replayed.
+                continue
+
+            # Wait for the shared rate limit at the start of each page, as a search request would.
+            if self.rate_limit_scheduler is not None and tweet_amount % self.tweets_per_page == 0:
+                self.rate_limit_scheduler.acquire()
+
+            # Wait until this tweet would have arrived at the simulated rate.
+            if self.tweets_per_second > 0:
+                time_until_due = replay_start + tweet_amount / self.tweets_per_second - time.monotonic()
+
+                if time_until_due > 0:
+                    time.sleep(time_until_due)
+
+            tweet_amount += 1
+
+            yield tweet_observation
+
+    def readRecordedTweets(self):
+        """
+        Yield each recorded tweet from the file as a dictionary. A json lines file is read one line at a time.
+        """
+        with open(self.filename) as recorded_file:
+            first_character = recorded_file.read(1)
+            recorded_file.seek(0)
+
+            if first_character == "[":  # A json file made by FileGenerator.createJSON() holds one list of tweets.
+                for recorded_tweet in json.load(recorded_file):
+                    yield recorded_tweet
+                return
+
+            for line in recorded_file:
+                if line.strip():  # Skip blank lines.
+                    yield json.loads(line)
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def buildObservation(recorded_tweet, exclude_retweets):
+        """
+        Turn a recorded tweet into an observation dictionary, or return None if it is an excluded retweet.
+        Raw status objects go through the same cleaning and dictionary building as fetched tweets, recorded
+        observation dictionaries have their text cleaned again.
+        """
+        if 'tweet_id' in recorded_tweet:  # Already an observation dictionary.
+            # Retweets are not marked in an observation, but their cleaned text starts with "RT".
+            if exclude_retweets and recorded_tweet['text'].startswith("RT "):
+                return None
+
+            tweet_observation = dict(recorded_tweet)  # Copy so the recorded tweet is left as it was.
+            tweet_observation['text'] = TwitterInterface.clean_tweet_text(tweet_observation['text'])
+
+            return tweet_observation
+
+        if exclude_retweets and 'retweeted_status' in recorded_tweet:
+            return None
+
+        # Extended tweets hold their text in full_text, otherwise it is in text.
+        if 'full_text' not in recorded_tweet:
+            recorded_tweet = dict(recorded_tweet, full_text=recorded_tweet.get('text', ""))
+
+        import tweepy
+
+        return TwitterInterface.buildObservation(tweepy.models.Status.parse(None, recorded_tweet))
@@ -0,0 +1,43 @@
+"""
+Author:                 Nathan Dunne
+Date last modified:     18/10/2026
+Purpose:                Remember what has been fetched and found for a search term between polls of the watch mode, so
+                        each poll only fetches and processes new tweets.
+"""
+
+import TopTweets  # The local class used for keeping the most favourited tweets seen so far.
+
+
+class SearchTermWatch:
+
+    def __init__(self, search_term, row_amount, timeline=None, geo_sentiment=None):
+        """
+        search_term is the term polled for, row_amount the amount of most favourited tweets kept for the table, and
+        timeline and geo_sentiment an optional SentimentTimeline and GeoSentiment the sentiment of new tweets is added
+        to.
+        """
+        self.search_term = search_term
+        self.timeline = timeline
+        self.geo_sentiment = geo_sentiment
+
+        self.since_id = None  # The highest tweet id fetched so far, the next poll only fetches newer tweets.
+        self.fetch_gaps = []  # [since_id, max_id] ranges of tweet ids a capped poll did not reach, filled in later.
+        self.tweet_amount = 0
+        self.poll_amount = 0
+
+        self.sentiment_counts = {1: 0, 0: 0, -1: 0}  # Amount of positive, neutral and negative tweets so far.
+        self.top_tweets = TopTweets.TopTweets(row_amount)  # The most favourited tweets fetched so far.
+
+        self.start_file = True  # The files are started over by the first poll and appended to by the rest.
+
+    def recordTweets(self, tweets):
+        """
+        Note a list of newly fetched tweet observation dictionaries, so the next poll fetches only newer tweets.
+        """
+        for each_tweet in tweets:
+            tweet_id = int(each_tweet['tweet_id'])
+
+            if self.since_id is None or tweet_id > self.since_id:
+                self.since_id = tweet_id
+
+        self.tweet_amount += len(tweets)
@@ -1,17 +1,64 @@
 """
 Author:                 Nathan Dunne (with attributions)
-Date last modified:     16/11/2018
+Date last modified:     18/10/2026
 Purpose:                Analyse the sentiment of tweets and display the sentiment analysis of those tweets.
 """
 
-from textblob import TextBlob  # Textblob is a natural language processing library that has a sentiment analysis module.
+# Textblob is a natural language processing library that has a sentiment analysis module. It is imported when the
+# first tweet is analysed, so runs that do not analyse sentiment do not pay for importing it.
 # Copyright 2013-2018 Steven Loria
 
+import LexiconSentiment  # The local class used for scoring whole batches of tweets with TextBlob's lexicon and NumPy.
+import os  # Required for the amount of CPUs, when a process per CPU is used.
+
 
 class SentimentAnalysis:
 
-    def __init__(self):
-        pass
+    # The scorers a batch of tweets can be analysed with. Both give the same labels, the lexicon scorer scores a whole
+    # batch at once with NumPy rather than building a TextBlob for each tweet.
+    scorers = ['textblob', 'lexicon']
+
+    def __init__(self, workers=1, chunk_size=250, cache=None, scorer='textblob'):
+        """
+        workers is the amount of processes used when scoring a batch of tweets, 1 scores them in this process and
+        None uses one process per CPU. The process pool is started by the first batch and kept for later batches
+        until close() is called.
+        chunk_size is the most tweets handed to a worker process at a time, smaller batches are split evenly across
+        the workers.
+        cache is an optional SentimentCache, texts found in it are not analysed again.
+        scorer is 'textblob' or 'lexicon', the lexicon scorer always scores in this process.
+        """
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.scorer = scorer
+
+        if scorer not in self.scorers:
+            raise ValueError("Unknown sentiment scorer: " + str(scorer))
+
+        self.lexicon_sentiment = LexiconSentiment.LexiconSentiment() if scorer == 'lexicon' else None
+
+        self.executor = None  # The process pool, started by the first batch scored with more than one worker.
+
+    def workerAmount(self):
+        """
+        Return the amount of processes tweets are scored with.
+        """
+        return self.workers if self.workers is not None else (os.cpu_count() or 1)
+
+    def warmUp(self):
+        """
+        Load the scorer's libraries and lexicon, and start the process pool, so the first batch is not slowed down.
+        """
+        self.scoreTweets(["warm up"] * (self.workerAmount() if self.lexicon_sentiment is None else 1))
+
+    def close(self):
+        """
+        Shut down the process pool, if one was started.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
 
     @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
     def analyseSentiment(tweet):
@@ -21,6 +68,8 @@ class SentimentAnalysis:
             https://dev.to/rodolfoferro/sentiment-analysis-on-trumpss-tweets-using-python-
         Copyright (c) 2018 Rodolfo Ferro
         """
+        from textblob import TextBlob  # Only slow the first time, later imports are a lookup of the loaded module.
+
         analysis = TextBlob(tweet)  # Use TextBlob to return an analysis on a tweet text string.
 
         # If the polarity of the sentiment is positive it is determined to be a positive tweet
@@ -33,9 +82,63 @@ class SentimentAnalysis:
         else:
             return -1
 
+    def analyseSentimentBatch(self, tweets):
+        """
+        Classify the polarity of a sequence (or data frame column) of tweet texts, returning a list of the same
+        -1/0/1 labels as analyseSentiment() in the same order as the given texts.
+        With more than one worker the texts are handed out to a process pool chunk_size texts at a time. If there is a
+        cache, only the texts it does not already hold are analysed.
+        """
+        tweets = list(tweets)  # A data frame column or generator is turned into a list so it can be chunked.
+
+        if self.cache is None:
+            return self.scoreTweets(tweets)
+
+        labels = [self.cache.get(tweet) for tweet in tweets]  # None marks a text that has not been analysed yet.
+
+        # Only analyse each uncached text once, no matter how many times it is repeated in the batch.
+        missed_tweets = [tweet for tweet, label in zip(tweets, labels) if label is None]
+        uncached_tweets = list(dict.fromkeys(missed_tweets))
+
+        self.cache.countRepeats(len(missed_tweets) - len(uncached_tweets))  # Repeats are not analysed again.
+
+        uncached_labels = dict(zip(uncached_tweets, self.scoreTweets(uncached_tweets)))
+
+        for tweet, label in uncached_labels.items():
+            self.cache.put(tweet, label)
+
+        return [uncached_labels[tweet] if label is None else label for tweet, label in zip(tweets, labels)]
+
+    def scoreTweets(self, tweets):
+        """
+        Analyse every text in a list of tweet texts, using a process pool if there is more than one worker.
+        """
+        if self.lexicon_sentiment is not None:
+            return self.lexicon_sentiment.scoreTweets(tweets)
+
+        worker_amount = self.workerAmount()
+
+        # A single worker, or a single text, is scored in this process.
+        if worker_amount <= 1 or len(tweets) <= 1:
+            return [self.analyseSentiment(tweet) for tweet in tweets]
+
+        if self.executor is None:
+            # Used to spread batch scoring across a pool of processes, only imported when there is more than one worker.
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Each worker process loads its own copy of TextBlob once, and the pool is kept for every later batch.
+            self.executor = ProcessPoolExecutor(max_workers=worker_amount)
+
+        # A batch no bigger than chunk_size, as streamed chunks are, is split so each worker gets a share of it.
+        chunk_size = max(1, min(self.chunk_size, -(-len(tweets) // worker_amount)))
+
+        # map() keeps the input order.
+        return list(self.executor.map(SentimentAnalysis.analyseSentiment, tweets, chunksize=chunk_size))
+
     def displaySentimentPercentages(self, data_frame):
         """
-        Utility function to display the sentiment percentages from a set of tweets.
+        Utility function to display the sentiment percentages from a set of tweets. Returns the sentiment label of
+        each tweet, in the order of the data frame.
         Code used in part and modified from:
             https://dev.to/rodolfoferro/sentiment-analysis-on-trumpss-tweets-using-python-
         Copyright (c) 2018 Rodolfo Ferro
@@ -43,19 +146,30 @@ class SentimentAnalysis:
         print("\nProcessing Sentiment Analysis")
 
         # For each tweet text component in given data frame, analyse and store the sentiment value.
-        data = [self.analyseSentiment(tweet) for tweet in data_frame['text']]
+        data = self.analyseSentimentBatch(data_frame['text'])
+
+        # Count the positive, neutral and negative tweets in one pass, rather than building a list of each.
+        sentiment_counts = {1: 0, 0: 0, -1: 0}
 
-        # Breakdown the polarities of all the tweets into 3 sub-lists.
-        # Identify all the positive tweets.
-        positive_tweets = [tweet for index, tweet in enumerate(data) if data[index] > 0]
+        for sentiment in data:
+            sentiment_counts[sentiment] += 1
 
-        # Identify all the neutral tweets.
-        neutral_tweets = [tweet for index, tweet in enumerate(data) if data[index] == 0]
+        self.displaySentimentCounts(sentiment_counts[1], sentiment_counts[0], sentiment_counts[-1])
+
+        return data
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def displaySentimentCounts(positive_amount, neutral_amount, negative_amount):
+        """
+        Display the sentiment percentages from the amount of positive, neutral and negative tweets.
+        """
+        total_amount = positive_amount + neutral_amount + negative_amount
 
-        # Identify all the negative tweets.
-        negative_tweets = [tweet for index, tweet in enumerate(data) if data[index] < 0]
+        if total_amount == 0:  # Avoid dividing by zero when no tweets were found.
+            print("No tweets to display sentiment percentages for.")
+            return
 
-        # The % of each perception is the size of each sub list in reference to the size of the whole data frame.
-        print("Percentage of positive tweets: {}%".format(len(positive_tweets) * 100 / len(data)))
-        print("Percentage of neutral tweets: {}%".format(len(neutral_tweets) * 100 / len(data)))
-        print("Percentage of negative tweets: {}%".format(len(negative_tweets) * 100 / len(data)))
+        # The % of each perception is the amount of each perception in reference to the total amount of tweets.
+        print("Percentage of positive tweets: {}%".format(positive_amount * 100 / total_amount))
+        print("Percentage of neutral tweets: {}%".format(neutral_amount * 100 / total_amount))
+        print("Percentage of negative tweets: {}%".format(negative_amount * 100 / total_amount))
@@ -0,0 +1,121 @@
+"""
+Author:                 Nathan Dunne
+Date last modified:     18/10/2026
+Purpose:                Remember the sentiment of tweet texts that have already been analysed, optionally between runs.
+"""
+
+from collections import OrderedDict  # An ordered dictionary keeps the cached texts in least recently used order.
+import json  # Required for reading and writing the cache from and to a json file.
+import os  # Required for checking if a cache file exists before loading it.
+import threading  # Required for sharing the cache safely between threads analysing different search terms.
+
+
+class SentimentCache:
+
+    def __init__(self, max_size=100000, filename=None):
+        """
+        max_size is the amount of texts kept before the least recently used text is dropped, 0 disables the cache so
+        no texts are kept, loaded or saved.
+        filename is an optional json file the cache is loaded from and saved to, so repeated runs skip texts that
+        have already been analysed.
+        """
+        self.max_size = max_size
+        self.filename = filename
+
+        self.entries = OrderedDict()  # Normalised text -> sentiment label, oldest first.
+        self.lock = threading.Lock()
+
+        # Counters used to size the cache, a hit is a text that did not need to be analysed again.
+        self.hits = 0
+        self.misses = 0
+
+        if filename is not None:
+            self.load()
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def normaliseText(tweet):
+        """
+        Build the cache key for a tweet text. Cleaned tweets that only differ in case or spacing score the same.
+        """
+        return ' '.join(tweet.lower().split())
+
+    def get(self, tweet):
+        """
+        Return the cached sentiment label of a tweet text, or None if the text has not been analysed yet.
+        """
+        key = self.normaliseText(tweet)
+
+        with self.lock:
+            label = self.entries.get(key)
+
+            if label is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)  # Mark the text as the most recently used.
+
+        return label
+
+    def countRepeats(self, amount):
+        """
+        Count an amount of texts that were looked up as misses but repeat a text analysed in the same batch, so were
+        not analysed again, as hits.
+        """
+        with self.lock:
+            self.misses -= amount
+            self.hits += amount
+
+    def put(self, tweet, label):
+        """
+        Store the sentiment label of a tweet text, dropping the least recently used text if the cache is full.
+        """
+        if self.max_size <= 0:  # The cache is disabled.
+            return
+
+        key = self.normaliseText(tweet)
+
+        with self.lock:
+            self.entries[key] = label
+            self.entries.move_to_end(key)
+
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)  # The first entry is the least recently used.
+
+    def load(self):
+        """
+        Load previously analysed texts from the cache file if one exists.
+        """
+        if self.filename is None or self.max_size <= 0 or not os.path.exists(self.filename):
+            return
+
+        try:
+            with open(self.filename) as cache_file:
+                stored_entries = json.load(cache_file)
+        except ValueError:  # A partially written or corrupt cache is ignored rather than stopping the run.
+            print("Error reading sentiment cache file: " + self.filename)
+            return
+
+        # The file is saved oldest first, so only the most recently used texts are kept if max_size has shrunk.
+        for key, label in list(stored_entries.items())[-self.max_size:]:
+            self.entries[key] = label
+
+    def save(self):
+        """
+        Save the cached texts to the cache file, oldest first. A disabled cache leaves the file as it is.
+        """
+        if self.filename is None or self.max_size <= 0:
+            return
+
+        with open(self.filename, 'w') as cache_file:
+            json.dump(self.entries, cache_file)
+
+    def displayStatistics(self):
+        """
+        Display the hit and miss counters of the cache.
+        """
+        lookups = self.hits + self.misses
+
+        print("Sentiment cache: {} hits, {} misses, {} texts stored.".format(self.hits, self.misses, len(self.entries)))
+
+        if lookups > 0:
+            print("Sentiment cache hit rate: {}%".format(self.hits * 100 / lookups))
@@ -0,0 +1,206 @@
+"""
+Author:                 Nathan Dunne
+Date last modified:     18/10/2026
+Purpose:                Keep running per minute and per hour sentiment counts of tweets, plain and weighted by
+                        favourites and retweets, that are updated one tweet at a time and merged between runs.
+"""
+
+import json  # Required for reading and writing the timeline from and to a json file.
+import os  # Required for checking if a timeline file exists before loading it.
+import time  # Required for displaying the start of each bucket as a time.
+
+from TweetColumns import TweetColumns  # Used for converting created_at texts to seconds since the epoch.
+
+
+class SentimentTimeline:
+
+    # The length of a bucket in seconds, by resolution.
+    resolutions = {'minute': 60, 'hour': 3600}
+
+    # Each bucket holds nine totals: the amount of positive, neutral and negative tweets, then their favourite counts,
+    # then their retweet counts. A sentiment label is the offset of its total within each three.
+    sentiment_offsets = {1: 0, 0: 1, -1: 2}
+    favorite_offset = 3
+    retweet_offset = 6
+
+    def __init__(self, filename=None):
+        """
+        filename is an optional json file the timeline is loaded from and saved to, so the counts of each run are added
+        to those of earlier runs. The highest tweet id counted is saved with the counts, and tweets at or below the id
+        saved by earlier runs are skipped, so fetching the same recent tweets again does not count them twice.
+        """
+        self.filename = filename
+
+        # Resolution -> start of the bucket in seconds since the epoch -> the nine totals of the bucket.
+        self.buckets = {resolution: {} for resolution in self.resolutions}
+
+        self.counted_tweet_id = None  # The highest tweet id counted by earlier runs, lower ids are skipped.
+        self.latest_tweet_id = None  # The highest tweet id counted so far, saved for later runs.
+
+        if filename is not None:
+            self.load()
+
+    def add(self, created_at, sentiment, favorite_count=0, retweet_count=0, tweet_id=None, skip_counted=True):
+        """
+        Add one tweet to the bucket it was created in at each resolution. created_at is seconds since the epoch or a
+        created_at text such as "2018-11-16 12:00:00", in UTC. A tweet_id at or below the highest id counted by earlier
+        runs is skipped, unless skip_counted is False for a caller that already knows the tweet is new, such as the
+        store filling in older tweets an earlier fetch did not reach.
+        """
+        if tweet_id is not None:
+            tweet_id = int(tweet_id)
+
+            if skip_counted and self.counted_tweet_id is not None and tweet_id <= self.counted_tweet_id:
+                return
+
+            if self.latest_tweet_id is None or tweet_id > self.latest_tweet_id:
+                self.latest_tweet_id = tweet_id
+
+        if isinstance(created_at, str):
+            created_at = TweetColumns.parseTimestamp(created_at)
+
+        offset = self.sentiment_offsets[sentiment]
+
+        for resolution, seconds in self.resolutions.items():
+            bucket_start = created_at - created_at % seconds
+
+            totals = self.buckets[resolution].get(bucket_start)
+
+            if totals is None:
+                totals = self.buckets[resolution][bucket_start] = [0] * 9
+
+            totals[offset] += 1
+            totals[self.favorite_offset + offset] += favorite_count
+            totals[self.retweet_offset + offset] += retweet_count
+
+    def addTweets(self, tweets, sentiments):
+        """
+        Add a list of observation dictionaries, or TweetColumns, with the sentiment label of each tweet.
+        """
+        if hasattr(tweets, 'rowValues'):  # TweetColumns already hold created_at as seconds since the epoch.
+            for created_at, sentiment, favorite_count, retweet_count, tweet_id in zip(tweets.created_at, sentiments,
+                                                                                      tweets.favorite_count,
+                                                                                      tweets.retweet_count,
+                                                                                      tweets.tweet_id):
+                self.add(created_at, sentiment, favorite_count, retweet_count, tweet_id)
+            return
+
+        for each_tweet, sentiment in zip(tweets, sentiments):
+            self.add(each_tweet['created_at'], sentiment, each_tweet['favorite_count'], each_tweet['retweet_count'],
+                     each_tweet['tweet_id'])
+
+    def merge(self, other_timeline):
+        """
+        Add the counts of another timeline to this one, e.g. one kept by another run or another process.
+        """
+        other_tweet_id = other_timeline.latest_tweet_id
+
+        if other_tweet_id is not None and (self.latest_tweet_id is None or other_tweet_id > self.latest_tweet_id):
+            self.latest_tweet_id = other_tweet_id
+
+        for resolution, other_buckets in other_timeline.buckets.items():
+            buckets = self.buckets.setdefault(resolution, {})
+
+            for bucket_start, other_totals in other_buckets.items():
+                totals = buckets.get(bucket_start)
+
+                if totals is None:
+                    buckets[bucket_start] = list(other_totals)
+                else:
+                    buckets[bucket_start] = [total + other_total for total, other_total in zip(totals, other_totals)]
+
+    def percentages(self, resolution, bucket_start):
+        """
+        Return the positive, neutral and negative percentages of a bucket, by tweets, by favourites and by retweets,
+        as a dictionary of (positive, neutral, negative) tuples. A weighting with nothing to weigh gives None.
+        """
+        totals = self.buckets[resolution].get(bucket_start, [0] * 9)
+
+        return {weighting: self.shares(totals[offset:offset + 3])
+                for weighting, offset in (('tweets', 0), ('favorites', self.favorite_offset),
+                                          ('retweets', self.retweet_offset))}
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def shares(amounts):
+        """
+        Return the percentage each of an amount of positive, neutral and negative is of their total, or None if the
+        total is 0.
+        """
+        total_amount = sum(amounts)
+
+        if total_amount == 0:
+            return None
+
+        return tuple(amount * 100 / total_amount for amount in amounts)
+
+    def load(self):
+        """
+        Load and merge in the counts of the timeline file if one exists. Tweets up to the highest tweet id it counted
+        are skipped from then on.
+        """
+        if self.filename is None or not os.path.exists(self.filename):
+            return
+
+        try:
+            with open(self.filename) as timeline_file:
+                stored_buckets = json.load(timeline_file)
+        except ValueError:  # A partially written or corrupt timeline is ignored rather than stopping the run.
+            print("Error reading sentiment timeline file: " + self.filename)
+            return
+
+        stored_timeline = SentimentTimeline()
+        stored_timeline.latest_tweet_id = stored_buckets.pop('latest_tweet_id', None)  # Not saved by older versions.
+
+        # json keys are always text, the bucket starts are turned back into numbers.
+        stored_timeline.buckets = {resolution: {int(bucket_start): totals for bucket_start, totals in buckets.items()}
+                                   for resolution, buckets in stored_buckets.items()}
+
+        self.merge(stored_timeline)
+
+        self.counted_tweet_id = self.latest_tweet_id
+
+    def save(self):
+        """
+        Save the counts to the timeline file, oldest bucket first, with the highest tweet id counted.
+        """
+        if self.filename is None:
+            return
+
+        stored_buckets = {resolution: {str(bucket_start): buckets[bucket_start] for bucket_start in sorted(buckets)}
+                          for resolution, buckets in self.buckets.items()}
+        stored_buckets['latest_tweet_id'] = self.latest_tweet_id
+
+        with open(self.filename, 'w') as timeline_file:
+            json.dump(stored_buckets, timeline_file)
+
+    def displayTimeline(self, resolution='hour', amount_of_buckets=24):
+        """
+        Display the sentiment percentages of the latest amount of buckets at a resolution, by tweets and weighted by
+        favourites and retweets.
+        """
+        buckets = self.buckets[resolution]
+
+        if len(buckets) == 0:
+            return
+
+        print("\nSentiment per " + resolution + " (UTC), positive/neutral/negative %:")
+        print("{:<17} {:>7} {:>20} {:>20} {:>20}".format("Start", "Tweets", "By tweets", "By favourites",
+                                                         "By retweets"))
+
+        for bucket_start in sorted(buckets)[-amount_of_buckets:]:
+            bucket_percentages = self.percentages(resolution, bucket_start)
+
+            print("{:<17} {:>7} {:>20} {:>20} {:>20}".format(
+                time.strftime("%Y-%m-%d %H:%M", time.gmtime(bucket_start)), sum(buckets[bucket_start][0:3]),
+                *[self.formatShares(bucket_percentages[weighting]) for weighting in ('tweets', 'favorites',
+                                                                                      'retweets')]))
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def formatShares(shares):
+        """
+        Format positive, neutral and negative percentages for display, or "-" if there are none.
+        """
+        if shares is None:
+            return "-"
+
+        return "/".join("{:.0f}".format(share) for share in shares)
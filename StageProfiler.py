@@ -0,0 +1,120 @@
+"""
+Author:                 Nathan Dunne
+Date last modified:     18/10/2026
+Purpose:                Record the wall and CPU time of each stage of a run, count what it handled and report both as
+                        json, optionally profiling one stage with cProfile.
+"""
+
+import cProfile  # Python has a built in profiler we can use to see which functions a stage spends its time in.
+import json  # Required for writing the report as a json file.
+import threading  # Required for recording stages of search terms running at once from different threads.
+import time  # Required for measuring wall and CPU time.
+from contextlib import contextmanager  # Lets a stage be timed with a with statement.
+
+
+class StageProfiler:
+
+    def __init__(self, profile_stage=None, profile_filename=None):
+        """
+        profile_stage is the name of an optional stage to profile with cProfile, its statistics are saved to
+        profile_filename, which can be read with the pstats module or a viewer such as snakeviz.
+        """
+        self.profile_stage = profile_stage
+        self.profile_filename = profile_filename or (str(profile_stage) + ".prof")
+
+        self.stages = {}  # Stage name -> calls, wall seconds and CPU seconds, in the order stages first ran.
+        self.counters = {}  # Counter name -> amount.
+        self.lock = threading.Lock()
+
+        # cProfile can only profile one thread at a time, so the stage is only profiled by one thread at once.
+        self.profiler = cProfile.Profile() if profile_stage is not None else None
+        self.profiler_lock = threading.Lock()
+
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time the code in a with statement as a stage. A stage that runs several times, or from several threads, adds
+        up. CPU time is of the calling thread, so it excludes worker processes and other threads.
+        """
+        profiling = (name == self.profile_stage and self.profiler_lock.acquire(blocking=False))
+
+        if profiling:
+            self.profiler.enable()
+
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+
+        try:
+            yield
+        finally:
+            wall_seconds = time.perf_counter() - start_wall
+            cpu_seconds = time.thread_time() - start_cpu
+
+            if profiling:
+                self.profiler.disable()
+                self.profiler_lock.release()
+
+            with self.lock:
+                stage = self.stages.setdefault(name, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+                stage['calls'] += 1
+                stage['wall_seconds'] += wall_seconds
+                stage['cpu_seconds'] += cpu_seconds
+
+    def count(self, name, amount=1):
+        """
+        Add an amount to a counter, e.g. tweets fetched or bytes written.
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self):
+        """
+        Return the stages, the counters and the total wall and CPU time of the run so far as a dictionary.
+        """
+        with self.lock:
+            return {'wall_seconds': time.perf_counter() - self.start_wall,
+                    'cpu_seconds': time.process_time() - self.start_cpu,
+                    'stages': {name: dict(stage) for name, stage in self.stages.items()},
+                    'counters': dict(self.counters)}
+
+    def saveProfile(self):
+        """
+        Save the cProfile statistics of the profiled stage to the profile file. Returns whether they were saved, which
+        they are not if no stage is profiled or the stage was never run.
+        """
+        if self.profiler is None:
+            return False
+
+        with self.lock:
+            stage_ran = self.profile_stage in self.stages
+
+        if not stage_ran:
+            print("\nStage " + self.profile_stage + " was not run, so was not profiled.")
+            return False
+
+        self.profiler.dump_stats(self.profile_filename)
+
+        print("\nWrote cProfile statistics of stage " + self.profile_stage + ": " + self.profile_filename)
+
+        return True
+
+    def writeReport(self, filename):
+        """
+        Write the report to a json file, or print it if the filename is "-". The cProfile statistics of the profiled
+        stage, if any, are saved too.
+        """
+        report = self.report()
+
+        if self.saveProfile():
+            report['profile'] = {'stage': self.profile_stage, 'filename': self.profile_filename}
+
+        if filename == "-":
+            print(json.dumps(report, indent=2))
+        else:
+            with open(filename, 'w') as report_file:
+                json.dump(report, report_file, indent=2)
+
+            print("\nWrote run report: " + filename)
@@ -0,0 +1,53 @@
+"""
+Author:                 Nathan Dunne
+Date last modified:     18/10/2026
+Purpose:                Keep the most favourited tweets seen so far while tweets are fetched, without keeping or sorting
+                        every tweet.
+"""
+
+import heapq  # Python's heap queue keeps the lowest ranked of the kept tweets at the front for quick replacement.
+
+
+class TopTweets:
+
+    def __init__(self, amount):
+        """
+        amount is how many of the highest ranked tweets are kept.
+        """
+        self.amount = amount
+
+        # A heap of (favorite_count, retweet_count, -index, index, tweet), lowest ranked first. The negated index
+        # ranks the earliest tweet higher among equal counts, matching the order of the data frame sort.
+        self.heap = []
+
+        self.tweet_amount = 0  # Amount of tweets offered so far, used as the index of the next tweet.
+
+    def add(self, tweet, index=None):
+        """
+        Offer a tweet observation dictionary, kept if it ranks among the amount of most favourited tweets so far.
+        The index defaults to the amount of tweets offered before it.
+        """
+        if index is None:
+            index = self.tweet_amount
+
+        self.tweet_amount += 1
+
+        entry = (tweet['favorite_count'], tweet['retweet_count'], -index, index, tweet)
+
+        if len(self.heap) < self.amount:
+            heapq.heappush(self.heap, entry)
+        elif entry[:3] > self.heap[0][:3]:  # Ranks above the lowest kept tweet, which it replaces.
+            heapq.heapreplace(self.heap, entry)
+
+    def addAll(self, tweets):
+        """
+        Offer every tweet in a list of tweet observation dictionaries.
+        """
+        for tweet in tweets:
+            self.add(tweet)
+
+    def rankedTweets(self):
+        """
+        Return the kept tweets as (index, tweet) pairs, highest ranked first.
+        """
+        return [(entry[3], entry[4]) for entry in sorted(self.heap, key=lambda entry: entry[:3], reverse=True)]
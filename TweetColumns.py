@@ -0,0 +1,278 @@
+"""
+Author:                 Nathan Dunne
+Date last modified:     18/10/2026
+Purpose:                Hold tweet observations as typed columns rather than a list of dictionaries, and build a data
+                        frame straight from those columns.
+"""
+
+from array import array  # Python's typed arrays hold numbers compactly, without an object per value.
+from datetime import datetime, timezone  # Required for converting the created_at text to a timestamp.
+import time  # Required for converting a timestamp back to the created_at text, which is quicker than datetime.
+
+
+class TweetColumns:
+
+    # The observation dictionary keys, in the order they are fetched and written to files.
+    observation_keys = ['created_at', 'text', 'favorite_count', 'retweet_count', 'tweet_id', 'self_favorited',
+                        'self_retweeted', 'lang', 'place', 'coordinates', 'in_reply_to_user_id',
+                        'in_reply_to_status_id']
+
+    # Text observations use these values where twitter had no data, the columns hold a null instead. The second value
+    # of place and coordinates marks data that was there but could not be read, which a flag column keeps.
+    no_data_values = {'place': ("noPlaceData", "placeDataInvalid"),
+                      'coordinates': ("noCoordinatesData", "coordDataInvalid"),
+                      'in_reply_to_user_id': ("noInReplyToUseridData",),
+                      'in_reply_to_status_id': ("noInReplyToStatusidData",)}
+
+    def __init__(self, tweets=()):
+        """
+        Start with empty columns and append any given observation dictionaries.
+        """
+        self.created_at = array('q')  # Seconds since the epoch, UTC.
+        self.text = []
+        self.favorite_count = array('q')
+        self.retweet_count = array('q')
+        self.tweet_id = array('q')
+        self.self_favorited = array('b')
+        self.self_retweeted = array('b')
+
+        # lang and place repeat a small set of values, so each row holds a code into a list of categories, -1 for null.
+        self.lang = array('i')
+        self.lang_categories = []
+        self.lang_codes = {}
+        self.place = array('i')
+        self.place_categories = []
+        self.place_codes = {}
+
+        # Coordinates are held as numbers, NaN where there are none.
+        self.longitude = array('d')
+        self.latitude = array('d')
+
+        # Flags marking the rows whose place or coordinates were there but could not be read, rather than missing.
+        self.place_invalid = array('b')
+        self.coordinates_invalid = array('b')
+
+        # Reply ids are mostly null, so a mask marks the rows that have one and the id is 0 otherwise.
+        self.in_reply_to_user_id = array('q')
+        self.in_reply_to_user_id_mask = array('b')
+        self.in_reply_to_status_id = array('q')
+        self.in_reply_to_status_id_mask = array('b')
+
+        for each_tweet in tweets:
+            self.append(each_tweet)
+
+    def __len__(self):
+        return len(self.tweet_id)
+
+    def __getitem__(self, index):
+        """
+        Return the observation dictionary at an index, as it was fetched.
+        """
+        return self.observation(index)
+
+    def __iter__(self):
+        """
+        Yield each row as an observation dictionary, so the columns can be written to files like a list of tweets.
+        """
+        for index in range(len(self)):
+            yield self.observation(index)
+
+    def append(self, tweet):
+        """
+        Append an observation dictionary to the columns.
+        """
+        self.created_at.append(self.parseTimestamp(tweet['created_at']))
+        self.text.append(tweet['text'])
+        self.favorite_count.append(int(tweet['favorite_count']))
+        self.retweet_count.append(int(tweet['retweet_count']))
+        self.tweet_id.append(int(tweet['tweet_id']))
+        self.self_favorited.append(bool(tweet['self_favorited']))
+        self.self_retweeted.append(bool(tweet['self_retweeted']))
+
+        self.lang.append(self.categoryCode(tweet['lang'], self.lang_categories, self.lang_codes))
+        self.place.append(self.categoryCode(self.valueOrNone(tweet, 'place'), self.place_categories,
+                                            self.place_codes))
+
+        longitude, latitude = self.parseCoordinates(self.valueOrNone(tweet, 'coordinates'))
+        self.longitude.append(longitude)
+        self.latitude.append(latitude)
+
+        self.place_invalid.append(tweet.get('place') == self.no_data_values['place'][1])
+        self.coordinates_invalid.append(tweet.get('coordinates') == self.no_data_values['coordinates'][1])
+
+        self.appendId(self.valueOrNone(tweet, 'in_reply_to_user_id'), self.in_reply_to_user_id,
+                      self.in_reply_to_user_id_mask)
+        self.appendId(self.valueOrNone(tweet, 'in_reply_to_status_id'), self.in_reply_to_status_id,
+                      self.in_reply_to_status_id_mask)
+
+    def observation(self, index):
+        """
+        Rebuild the observation dictionary at an index, with the same text values as when it was fetched.
+        """
+        place_code = self.place[index]
+
+        if self.longitude[index] != self.longitude[index]:  # NaN is the only value not equal to itself.
+            coordinates = self.no_data_values['coordinates'][self.coordinates_invalid[index]]
+        else:
+            coordinates = "[{}, {}]".format(self.longitude[index], self.latitude[index])
+
+        return {'created_at': time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(self.created_at[index])),
+                'text': self.text[index],
+                'favorite_count': self.favorite_count[index],
+                'retweet_count': self.retweet_count[index],
+                'tweet_id': str(self.tweet_id[index]),
+                'self_favorited': bool(self.self_favorited[index]),
+                'self_retweeted': bool(self.self_retweeted[index]),
+                'lang': self.lang_categories[self.lang[index]] if self.lang[index] >= 0 else None,
+                'place': (self.place_categories[place_code] if place_code >= 0
+                          else self.no_data_values['place'][self.place_invalid[index]]),
+                'coordinates': coordinates,
+                'in_reply_to_user_id': self.idOrNoData(index, 'in_reply_to_user_id'),
+                'in_reply_to_status_id': self.idOrNoData(index, 'in_reply_to_status_id')}
+
+    def rowValues(self, start, stop):
+        """
+        Return the rows from start up to stop as tuples of observation values, in the order of the observation keys.
+        Each column is converted a slice at a time, which is quicker than rebuilding a dictionary per row.
+        """
+        no_place_values = self.no_data_values['place']
+        no_coordinates_values = self.no_data_values['coordinates']
+
+        lang_categories = self.lang_categories + [None]  # A code of -1 picks the last item, None.
+
+        place = [self.place_categories[code] if code >= 0 else no_place_values[invalid]
+                 for code, invalid in zip(self.place[start:stop], self.place_invalid[start:stop])]
+
+        coordinates = ["[{}, {}]".format(longitude, latitude) if longitude == longitude
+                       else no_coordinates_values[invalid]
+                       for longitude, latitude, invalid in zip(self.longitude[start:stop], self.latitude[start:stop],
+                                                               self.coordinates_invalid[start:stop])]
+
+        return list(zip([time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(created_at))
+                         for created_at in self.created_at[start:stop]],
+                        self.text[start:stop],
+                        self.favorite_count[start:stop],
+                        self.retweet_count[start:stop],
+                        map(str, self.tweet_id[start:stop]),
+                        map(bool, self.self_favorited[start:stop]),
+                        map(bool, self.self_retweeted[start:stop]),
+                        [lang_categories[code] for code in self.lang[start:stop]],
+                        place,
+                        coordinates,
+                        self.idsOrNoData('in_reply_to_user_id', start, stop),
+                        self.idsOrNoData('in_reply_to_status_id', start, stop)))
+
+    def toDataFrame(self):
+        """
+        Build a pandas data frame straight from the columns, with int64 ids and counts, datetime64 timestamps, real
+        nulls and categorical lang and place columns.
+        """
+        import numpy  # Imported here as only building a data frame needs numpy and pandas.
+        import pandas
+
+        def column(values, dtype):
+            # Copy the typed array into a numpy array, so the columns can still be appended to afterwards.
+            return numpy.frombuffer(values, dtype=dtype).copy()
+
+        return pandas.DataFrame({
+            'created_at': pandas.to_datetime(column(self.created_at, numpy.int64), unit='s'),
+            'text': self.text,
+            'favorite_count': column(self.favorite_count, numpy.int64),
+            'retweet_count': column(self.retweet_count, numpy.int64),
+            'tweet_id': column(self.tweet_id, numpy.int64),
+            'self_favorited': column(self.self_favorited, numpy.int8).astype(bool),
+            'self_retweeted': column(self.self_retweeted, numpy.int8).astype(bool),
+            'lang': pandas.Categorical.from_codes(column(self.lang, numpy.int32), categories=self.lang_categories),
+            'place': pandas.Categorical.from_codes(column(self.place, numpy.int32), categories=self.place_categories),
+            'longitude': column(self.longitude, numpy.float64),
+            'latitude': column(self.latitude, numpy.float64),
+            'in_reply_to_user_id': pandas.arrays.IntegerArray(column(self.in_reply_to_user_id, numpy.int64),
+                                                              column(self.in_reply_to_user_id_mask, numpy.int8) == 0),
+            'in_reply_to_status_id': pandas.arrays.IntegerArray(
+                column(self.in_reply_to_status_id, numpy.int64),
+                column(self.in_reply_to_status_id_mask, numpy.int8) == 0)})
+
+    @classmethod  # Method is a class method as it uses the no data values but no values of the self object.
+    def valueOrNone(cls, tweet, key):
+        """
+        Return the value of a key in an observation dictionary, or None if it is a no data value.
+        """
+        value = tweet.get(key)
+
+        if value in cls.no_data_values[key]:
+            return None
+
+        return value
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def parseTimestamp(created_at):
+        """
+        Return the seconds since the epoch of a created_at text such as "2018-11-16 12:00:00", which is in UTC.
+        """
+        timestamp = datetime.fromisoformat(created_at)
+
+        if timestamp.tzinfo is None:  # Twitter times are UTC even when the text has no time zone.
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+        return int(timestamp.timestamp())
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def categoryCode(value, categories, codes):
+        """
+        Return the code of a category value, adding it to the categories if it is new. None has the code -1.
+        """
+        if value is None:
+            return -1
+
+        code = codes.get(value)
+
+        if code is None:
+            code = len(categories)
+            codes[value] = code
+            categories.append(value)
+
+        return code
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def parseCoordinates(coordinates):
+        """
+        Return the (longitude, latitude) of a coordinates text such as "[-86.4716, 40.0521]", NaNs if there are none.
+        """
+        if coordinates is None:
+            return float('nan'), float('nan')
+
+        try:
+            longitude, latitude = coordinates.strip("[]").split(",")
+            return float(longitude), float(latitude)
+        except ValueError:
+            return float('nan'), float('nan')
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def appendId(value, ids, mask):
+        """
+        Append an id to an id column and its mask, None is appended as 0 with the mask unset.
+        """
+        if value is None:
+            ids.append(0)
+            mask.append(0)
+        else:
+            ids.append(int(value))
+            mask.append(1)
+
+    def idOrNoData(self, index, key):
+        """
+        Return the id of an id column at an index, or its no data value where there is none.
+        """
+        if getattr(self, key + "_mask")[index]:
+            return getattr(self, key)[index]
+
+        return self.no_data_values[key][0]
+
+    def idsOrNoData(self, key, start, stop):
+        """
+        Return the ids of an id column from start up to stop, with its no data value where there is none.
+        """
+        no_data = self.no_data_values[key][0]
+
+        return [value if has_value else no_data
+                for value, has_value in zip(getattr(self, key)[start:stop], getattr(self, key + "_mask")[start:stop])]
@@ -0,0 +1,280 @@
+"""
+Author:                 Nathan Dunne
+Date last modified:     18/10/2026
+Purpose:                Keep fetched tweets and their sentiment in a local SQLite database between runs, so only new
+                        tweets need to be fetched and analysed.
+"""
+
+import sqlite3  # Python has a built in SQLite library we can use to keep a local database file.
+
+from GeoSentiment import GeoSentiment  # Used for the grid cell of each tweet's coordinates.
+from TweetColumns import TweetColumns  # Used for reading the longitude and latitude of a coordinates text.
+
+
+class TweetStore:
+
+    # The observation dictionary keys, in the order they are stored and returned.
+    observation_keys = ['created_at', 'text', 'favorite_count', 'retweet_count', 'tweet_id', 'self_favorited',
+                        'self_retweeted', 'lang', 'place', 'coordinates', 'in_reply_to_user_id',
+                        'in_reply_to_status_id']
+
+    def __init__(self, filename="tweetStore.db"):
+        """
+        Open, or create, the database file. Tweets are stored once per search term, indexed by their tweet id.
+        """
+        self.filename = filename
+
+        # Several search terms may be stored at once from different threads, each with its own TweetStore, so wait
+        # for another thread's write to finish rather than failing straight away.
+        self.connection = sqlite3.connect(filename, timeout=60)
+
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS tweets (
+                                       search_term TEXT NOT NULL,
+                                       tweet_id INTEGER NOT NULL,
+                                       created_at TEXT,
+                                       text TEXT,
+                                       favorite_count INTEGER,
+                                       retweet_count INTEGER,
+                                       self_favorited INTEGER,
+                                       self_retweeted INTEGER,
+                                       lang TEXT,
+                                       place TEXT,
+                                       coordinates TEXT,
+                                       in_reply_to_user_id,
+                                       in_reply_to_status_id,
+                                       sentiment INTEGER,
+                                       longitude REAL,
+                                       latitude REAL,
+                                       grid_cell INTEGER,
+                                       PRIMARY KEY (search_term, tweet_id))""")
+
+        self.addGeoColumns()
+
+        # Ranges of tweet ids of a search term that a capped fetch did not reach, for later fetches to fill in.
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS fetch_gaps (
+                                       search_term TEXT NOT NULL,
+                                       since_id INTEGER NOT NULL,
+                                       max_id INTEGER NOT NULL)""")
+
+        # Ranking the most favourited tweets of a search term reads this index instead of sorting the table.
+        self.connection.execute("""CREATE INDEX IF NOT EXISTS tweets_by_favorites
+                                   ON tweets (search_term, favorite_count DESC, retweet_count DESC)""")
+
+        # Counting sentiment per place or per grid cell, or of the cells of a region, reads these indexes.
+        self.connection.execute("""CREATE INDEX IF NOT EXISTS tweets_by_place
+                                   ON tweets (search_term, place, sentiment)""")
+        self.connection.execute("""CREATE INDEX IF NOT EXISTS tweets_by_grid_cell
+                                   ON tweets (search_term, grid_cell, sentiment)""")
+
+        # Finding the tweets still to analyse reads this partial index, which only holds tweets without a sentiment,
+        # rather than scanning every stored tweet of the search term.
+        self.connection.execute("""CREATE INDEX IF NOT EXISTS tweets_unanalysed
+                                   ON tweets (search_term) WHERE sentiment IS NULL""")
+
+        self.connection.commit()
+
+    def addGeoColumns(self):
+        """
+        Add the longitude, latitude and grid_cell columns to a database made before they were stored, filled in from
+        the coordinates text of each tweet.
+        """
+        column_names = [row[1] for row in self.connection.execute("PRAGMA table_info(tweets)")]
+
+        if 'grid_cell' in column_names:
+            return
+
+        for column_definition in ("longitude REAL", "latitude REAL", "grid_cell INTEGER"):
+            self.connection.execute("ALTER TABLE tweets ADD COLUMN " + column_definition)
+
+        rows = self.connection.execute("SELECT rowid, coordinates FROM tweets").fetchall()
+
+        self.connection.executemany("UPDATE tweets SET longitude = ?, latitude = ?, grid_cell = ? WHERE rowid = ?",
+                                    (self.geoValues(coordinates) + (rowid,) for rowid, coordinates in rows))
+        self.connection.commit()
+
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def geoValues(coordinates):
+        """
+        Return the (longitude, latitude, grid_cell) of a coordinates text, Nones if the tweet has no coordinates.
+        """
+        if coordinates is None or coordinates in TweetColumns.no_data_values['coordinates']:
+            return None, None, None
+
+        longitude, latitude = TweetColumns.parseCoordinates(coordinates)
+
+        if longitude != longitude:  # NaN, the text could not be read.
+            return None, None, None
+
+        return longitude, latitude, GeoSentiment.gridCell(longitude, latitude)
+
+    def close(self):
+        """
+        Close the database file.
+        """
+        self.connection.close()
+
+    def latestTweetId(self, search_term):
+        """
+        Return the highest tweet id stored for a search term, or None if none are stored. Tweet ids increase over time,
+        so fetching can resume after this id.
+        """
+        return self.connection.execute("SELECT MAX(tweet_id) FROM tweets WHERE search_term = ?",
+                                       (search_term,)).fetchone()[0]
+
+    def fetchGaps(self, search_term):
+        """
+        Return the [since_id, max_id] ranges of tweet ids of a search term that earlier fetches did not reach, oldest
+        first. Tweets with an id above since_id and up to and including max_id may not have been fetched.
+        """
+        return [list(row) for row in self.connection.execute("SELECT since_id, max_id FROM fetch_gaps "
+                                                             "WHERE search_term = ? ORDER BY since_id",
+                                                             (search_term,))]
+
+    def storeFetchGaps(self, search_term, fetch_gaps):
+        """
+        Replace the stored ranges of tweet ids of a search term that earlier fetches did not reach.
+        """
+        self.connection.execute("DELETE FROM fetch_gaps WHERE search_term = ?", (search_term,))
+        self.connection.executemany("INSERT INTO fetch_gaps VALUES (?, ?, ?)",
+                                    ((search_term, since_id, max_id) for since_id, max_id in fetch_gaps))
+        self.connection.commit()
+
+    def insertTweets(self, search_term, tweets):
+        """
+        Store a list of observation dictionaries for a search term, skipping tweets that are already stored.
+        Returns the amount of tweets that were new.
+        """
+        changes_before = self.connection.total_changes
+
+        stored_keys = [key for key in self.observation_keys if key != 'tweet_id']
+        column_names = ['search_term', 'tweet_id'] + stored_keys + ['longitude', 'latitude', 'grid_cell']
+
+        # The grid cell of each tweet is worked out once here, so counting the tweets of a region needs no parsing.
+        self.connection.executemany("INSERT OR IGNORE INTO tweets (" + ", ".join(column_names) + ") "
+                                    "VALUES (" + ", ".join(["?"] * len(column_names)) + ")",
+                                    ([search_term, int(each_tweet['tweet_id'])] +
+                                     [each_tweet[key] for key in stored_keys] +
+                                     list(self.geoValues(each_tweet['coordinates']))
+                                     for each_tweet in tweets))
+        self.connection.commit()
+
+        return self.connection.total_changes - changes_before
+
+    def unanalysedTweets(self, search_term, amount):
+        """
+        Return up to an amount of (tweet_id, text, created_at, favorite_count, retweet_count) rows of a search term
+        that have no sentiment stored yet.
+        """
+        return self.connection.execute("SELECT tweet_id, text, created_at, favorite_count, retweet_count FROM tweets "
+                                       "WHERE search_term = ? AND sentiment IS NULL LIMIT ?",
+                                       (search_term, amount)).fetchall()
+
+    def storeSentiment(self, search_term, tweet_ids, sentiments):
+        """
+        Store the sentiment labels of a list of tweet ids of a search term.
+        """
+        self.connection.executemany("UPDATE tweets SET sentiment = ? WHERE search_term = ? AND tweet_id = ?",
+                                    ((sentiment, search_term, tweet_id)
+                                     for tweet_id, sentiment in zip(tweet_ids, sentiments)))
+        self.connection.commit()
+
+    def sentimentCounts(self, search_term):
+        """
+        Return a dictionary of the amount of positive (1), neutral (0) and negative (-1) tweets of a search term.
+        """
+        sentiment_counts = {1: 0, 0: 0, -1: 0}
+
+        for sentiment, amount in self.connection.execute("SELECT sentiment, COUNT(*) FROM tweets "
+                                                         "WHERE search_term = ? AND sentiment IS NOT NULL "
+                                                         "GROUP BY sentiment", (search_term,)):
+            sentiment_counts[sentiment] = amount
+
+        return sentiment_counts
+
+    def geoSentimentCounts(self, search_term, region=None):
+        """
+        Return the amount of positive (1), neutral (0) and negative (-1) tweets of a search term per place and per
+        grid cell, as two dictionaries of place name or cell number to sentiment counts. If region is a
+        (min_longitude, min_latitude, max_longitude, max_latitude) box only the cells of tweets in it are counted.
+        """
+        no_place_values = TweetColumns.no_data_values['place']
+
+        place_counts = {}
+
+        for place, sentiment, amount in self.connection.execute(
+                "SELECT place, sentiment, COUNT(*) FROM tweets "
+                "WHERE search_term = ? AND sentiment IS NOT NULL AND place NOT IN (?, ?) "
+                "GROUP BY place, sentiment", (search_term,) + no_place_values):
+            place_counts.setdefault(place, {})[sentiment] = amount
+
+        cell_condition = "grid_cell IS NOT NULL"
+        parameters = [search_term]
+
+        if region is not None:
+            # Each grid row the region overlaps is a range of cell numbers the index is read by, then the edge cells
+            # are trimmed to the region by their coordinates.
+            cell_ranges = GeoSentiment.regionCellRanges(region)
+
+            cell_condition = ("(" + " OR ".join(["grid_cell BETWEEN ? AND ?"] * len(cell_ranges)) + ") "
+                              "AND longitude BETWEEN ? AND ? AND latitude BETWEEN ? AND ?")
+            parameters += [cell for cell_range in cell_ranges for cell in cell_range]
+            parameters += [region[0], region[2], region[1], region[3]]
+
+        cell_counts = {}
+
+        for cell, sentiment, amount in self.connection.execute(
+                "SELECT grid_cell, sentiment, COUNT(*) FROM tweets "
+                "WHERE search_term = ? AND sentiment IS NOT NULL AND " + cell_condition + " "
+                "GROUP BY grid_cell, sentiment", parameters):
+            cell_counts.setdefault(cell, {})[sentiment] = amount
+
+        return place_counts, cell_counts
+
+    def tweetCount(self, search_term):
+        """
+        Return the amount of tweets stored for a search term.
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM tweets WHERE search_term = ?",
+                                       (search_term,)).fetchone()[0]
+
+    def iterateTweets(self, search_term):
+        """
+        Yield every stored tweet of a search term as an observation dictionary, in the order they were stored.
+        """
+        cursor = self.connection.execute("SELECT " + ", ".join(self.observation_keys) + " FROM tweets "
+                                         "WHERE search_term = ? ORDER BY rowid", (search_term,))
+
+        for row in cursor:
+            yield self.rowToObservation(row)
+
+    def topTweets(self, search_term, amount):
+        """
+        Return the amount of most favourited tweets of a search term as (index, observation dictionary) pairs, ordered
+        by favourite count and then retweet count, descending, with the earliest stored tweet first among equals.
+        The index is the position the tweet was stored in among the tweets of the search term, counting from 0 like a
+        fetched data set, which is also its row in the files made from the store.
+        """
+        # The rows come from the index in ranked order, so only the returned tweets have their earlier tweets counted.
+        cursor = self.connection.execute("SELECT (SELECT COUNT(*) FROM tweets AS earlier "
+                                         "WHERE earlier.search_term = tweets.search_term "
+                                         "AND earlier.rowid < tweets.rowid), " +
+                                         ", ".join(self.observation_keys) + " FROM tweets "
+                                         "WHERE search_term = ? "
+                                         "ORDER BY favorite_count DESC, retweet_count DESC, rowid LIMIT ?",
+                                         (search_term, amount))
+
+        return [(row[0], self.rowToObservation(row[1:])) for row in cursor]
+
+    @classmethod  # Method is a class method as it uses the observation keys but no values of the self object.
+    def rowToObservation(cls, row):
+        """
+        Turn a stored row back into an observation dictionary as it was fetched.
+        """
+        observation = dict(zip(cls.observation_keys, row))
+
+        # Ids are observed as strings and flags as booleans, SQLite stores them as integers.
+        observation['tweet_id'] = str(observation['tweet_id'])
+        observation['self_favorited'] = bool(observation['self_favorited'])
+        observation['self_retweeted'] = bool(observation['self_retweeted'])
+
+        return observation
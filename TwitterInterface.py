@@ -1,26 +1,42 @@
 """
 Author:                 Nathan Dunne (with attributions)
-Date last modified:     16/11/2018
+Date last modified:     18/10/2026
 Purpose:                Authenticate with twitter, fetch and clean tweets.
 """
 
-import tweepy  # The tweepy library is the library used to fetch the twitter observations.
+# The tweepy library is the library used to fetch the twitter observations. It is imported by the methods that use
+# it, so replaying and cleaning tweets do not pay for importing it.
 # MIT License Copyright (c) 2013-2014 Joshua Roesslein
 
 import re  # Pythons regular expression library is used to clean up the observations.
 import json  # Required for reading in credentials from a json file.
 
+from TweetColumns import TweetColumns  # The local class used for holding fetched observations as typed columns.
+
 
 class TwitterInterface:
     api = ""
 
+    # Compiled once and used to clean every tweet. Each match is a mention, a link or a run of letters and numbers,
+    # only the runs of letters and numbers are captured, so everything else in the tweet text is dropped in one pass.
+    tweet_token_pattern = re.compile(r"@[A-Za-z0-9]+|[0-9A-Za-z]\w*://\S+|([0-9A-Za-z]+)", re.ASCII)
+
     # Twitter API credentials
     consumer_key = ""
     consumer_secret = ""
     access_key = ""
     access_secret = ""
 
-    def __init__(self):
+    # Search results are requested in pages of this many tweets, the most the standard search endpoint allows.
+    tweets_per_page = 100
+
+    def __init__(self, rate_limit_scheduler=None):
+        """
+        rate_limit_scheduler is an optional RateLimitScheduler shared with other fetches, a token is taken from it
+        before each search request.
+        """
+
+        self.rate_limit_scheduler = rate_limit_scheduler
 
         self.setCredentials()  # Set the credentials for authentications.
         self.api = self.authenticate()  # Authenticate using the set credentials.
@@ -48,6 +64,7 @@ class TwitterInterface:
         """
         Authenticate with twitter using the authentication keys.
         """
+        import tweepy
 
         # Using the consumer key and consumer secret, create an authentication variable from twitters OAuth.
         auth = tweepy.OAuthHandler(self.consumer_key, self.consumer_secret)
@@ -60,13 +77,30 @@ class TwitterInterface:
 
         return api
 
-    def fetchTweets(self, search_term, amount_of_tweets, exclude_retweets):
+    def fetchTweets(self, search_term, amount_of_tweets, exclude_retweets, since_id=None):
         """
         Fetch an amount of tweets based on a search term, possibly excluding retweets.
-        Clean tweets up and add observations as dictionaries to a list, tweet_observations.
-         """
+        Clean tweets up and add observations to typed columns, tweet_observations, which can be read back as a list of
+        dictionaries or turned straight into a data frame.
+        """
+
+        # Collect every observation dictionary yielded by streamTweets() into typed columns.
+        tweet_observations = TweetColumns(self.streamTweets(search_term, amount_of_tweets, exclude_retweets,
+                                                            since_id))
 
-        tweet_observations = []  # List to hold observation dictionaries.
+        print("Fetched " + str(len(tweet_observations)) + " observations.")
+
+        return tweet_observations
+
+    def streamTweets(self, search_term, amount_of_tweets, exclude_retweets, since_id=None, max_id=None):
+        """
+        Fetch an amount of tweets based on a search term, possibly excluding retweets.
+        Each tweet is cleaned and yielded as an observation dictionary as soon as it arrives, so the caller can process
+        and store tweets without holding all of them in memory.
+        If since_id is given only tweets newer than that tweet id are fetched, and if max_id is given only tweets up to
+        and including that tweet id. Tweets are fetched newest first.
+        """
+        import tweepy
 
         # As retweets are simply copies of already made tweets, they can be excluded by appending the search term.
         if exclude_retweets:
@@ -75,98 +109,135 @@ class TwitterInterface:
         print("Searching for tweets containing: " + search_term)
         print("\nFetching " + str(amount_of_tweets) + " twitter observations...")
 
-        # For each tweet_observation in our search in English, up to an amount of tweets, based on a term.
+        # Only ask twitter for tweets after since_id if one is given, resuming where an earlier fetch finished.
+        search_options = {} if since_id is None else {'since_id': since_id}
+
+        if max_id is not None:  # Page down from max_id, filling in tweets an earlier fetch did not reach.
+            search_options['max_id'] = max_id
+
+        # Pages of tweets in our search in English, based on a term.
         # tweet_mode='extended' is vital here as without it any tweet >140 characters will be cut when fetched.
-        for tweet_observation in tweepy.Cursor(self.api.search,
-                                               q=search_term,
-                                               tweet_mode='extended',
-                                               include_entities=True, lang="en").items(amount_of_tweets):
-
-            """
-            To avoid entering None(null) values into fields where no data can be found, selection structures are
-            in place to determine if a value is null or not where null values have been previously observed.
-            """
-            if tweet_observation.place is None:
-                tweet_observation.place = "noPlaceData"  # Define location as having no data.
-            else:  # Retrieve location from the string.
-                tweet_observation.place = self.retrieveLocation(str(tweet_observation.place))
-
-            if tweet_observation.coordinates is None:
-                tweet_observation.coordinates = "noCoordinatesData"  # Define coordinates as having no data.
-            else:  # Retrieve coordinates from the string.
-                tweet_observation.coordinates = self.retrieveCoords(str(tweet_observation.coordinates))
-
-            if tweet_observation.in_reply_to_user_id is None:
-                tweet_observation.in_reply_to_user_id = "noInReplyToUseridData"  # Define no data.
-
-            if tweet_observation.in_reply_to_status_id is None:
-                tweet_observation.in_reply_to_status_id = "noInReplyToStatusidData"  # Define no data.
-
-            # Convert the text object to a string, encode it in utf-8.
-            # '[1:]' strips out the 1st character of the string, removing the 'b' character that all tweets start with.
-            tweet_observation.full_text = str(tweet_observation.full_text.encode("utf-8"))[1:]
-
-            # Clean up the tweet text to remove unwanted text such as links and special characters.
-            # This is required for much accurate sentiment analysis performed later.
-            tweet_observation.full_text = self.clean_tweet_text(tweet_observation.full_text)
-
-            # Add the relevant data to the tweet_observations using a dictionary structure.
-            tweet_observations.append({'created_at': str(tweet_observation.created_at),
-                                       'text': tweet_observation.full_text,
-                                       'favorite_count': int(tweet_observation.favorite_count),
-                                       'retweet_count': int(tweet_observation.retweet_count),
-                                       'tweet_id': str(tweet_observation.id),
-                                       'self_favorited': tweet_observation.favorited,
-                                       'self_retweeted': tweet_observation.retweeted,
-                                       'lang': tweet_observation.lang,
-                                       'place': tweet_observation.place,
-                                       'coordinates': tweet_observation.coordinates,
-                                       'in_reply_to_user_id': tweet_observation.in_reply_to_user_id,
-                                       'in_reply_to_status_id': tweet_observation.in_reply_to_status_id})
-
-        print("Fetched " + str(amount_of_tweets) + " observations.")
+        pages = tweepy.Cursor(self.api.search,
+                              q=search_term,
+                              tweet_mode='extended',
+                              include_entities=True, lang="en",
+                              count=self.tweets_per_page,
+                              **search_options).pages()
 
-        return tweet_observations
+        tweet_amount = 0
 
-    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
-    def clean_tweet_text(tweet):
+        # For each tweet_observation in each page, up to an amount of tweets.
+        while tweet_amount < amount_of_tweets:
+            if self.rate_limit_scheduler is not None:
+                self.rate_limit_scheduler.acquire()  # Wait for the shared rate limit before requesting the page.
+
+            page = next(pages, None)
+
+            if not page:  # There are no more tweets for the search term.
+                return
+
+            for tweet_observation in page[:amount_of_tweets - tweet_amount]:
+                tweet_amount += 1
+
+                yield self.buildObservation(tweet_observation)
+
+    @classmethod  # Method is a class method as it uses the other static methods but no values of the self object.
+    def buildObservation(cls, tweet_observation):
+        """
+        Clean up a fetched tweet and return the relevant data as an observation dictionary.
+        """
+
+        """
+        To avoid entering None(null) values into fields where no data can be found, selection structures are
+        in place to determine if a value is null or not where null values have been previously observed.
+        """
+        if tweet_observation.place is None:
+            tweet_observation.place = "noPlaceData"  # Define location as having no data.
+        else:  # Retrieve the name of the place from the place object.
+            tweet_observation.place = cls.retrievePlaceName(tweet_observation.place)
+
+        if tweet_observation.coordinates is None:
+            tweet_observation.coordinates = "noCoordinatesData"  # Define coordinates as having no data.
+        else:  # Retrieve the longitude and latitude from the coordinates object.
+            longitude, latitude = cls.retrieveCoordinates(tweet_observation.coordinates)
+
+            if longitude is None:
+                tweet_observation.coordinates = "coordDataInvalid"
+            else:
+                tweet_observation.coordinates = "[{}, {}]".format(longitude, latitude)  # e.g. [-86.4716, 40.0521]
+
+        if tweet_observation.in_reply_to_user_id is None:
+            tweet_observation.in_reply_to_user_id = "noInReplyToUseridData"  # Define no data.
+
+        if tweet_observation.in_reply_to_status_id is None:
+            tweet_observation.in_reply_to_status_id = "noInReplyToStatusidData"  # Define no data.
+
+        # Clean up the tweet text to remove unwanted text such as links, special characters and non-ASCII characters.
+        # This is required for much accurate sentiment analysis performed later.
+        tweet_observation.full_text = cls.clean_tweet_text(tweet_observation.full_text)
+
+        # Return the relevant data of the tweet_observation using a dictionary structure.
+        return {'created_at': str(tweet_observation.created_at),
+                'text': tweet_observation.full_text,
+                'favorite_count': int(tweet_observation.favorite_count),
+                'retweet_count': int(tweet_observation.retweet_count),
+                'tweet_id': str(tweet_observation.id),
+                'self_favorited': tweet_observation.favorited,
+                'self_retweeted': tweet_observation.retweeted,
+                'lang': tweet_observation.lang,
+                'place': tweet_observation.place,
+                'coordinates': tweet_observation.coordinates,
+                'in_reply_to_user_id': tweet_observation.in_reply_to_user_id,
+                'in_reply_to_status_id': tweet_observation.in_reply_to_status_id}
+
+    @classmethod  # Method is a class method as it uses the compiled pattern but no values of the self object.
+    def clean_tweet_text(cls, tweet):
         """
         Utility function to clean the text in a tweet by removing links and special characters using regular expression.
-        Code taken in part and modified from:
+        Mentions, links and any character that is not an ASCII letter or number are dropped, the remaining words are
+        joined by single spaces. Code taken in part and modified from:
             https://dev.to/rodolfoferro/sentiment-analysis-on-trumpss-tweets-using-python-
         Copyright (c) 2018 Rodolfo Ferro
         """
-        return ' '.join(re.sub("(@[A-Za-z0-9]+)|([^0-9A-Za-z \t])|(\w+:\/\/\S+)", " ", tweet).split())
+        return ' '.join(filter(None, cls.tweet_token_pattern.findall(tweet)))
 
-    # Hacks begin.
+    @classmethod  # Method is a class method as it uses the compiled pattern but no values of the self object.
+    def clean_tweet_texts(cls, tweets):
+        """
+        Clean a list of tweet texts in the same way as clean_tweet_text(), returning a list of cleaned texts.
+        """
+        find_words = cls.tweet_token_pattern.findall  # Look the method up once rather than once per tweet.
 
-    """
-    These retrieveLocation() and  retrieveCoords() (below) methods are string manipulation hacks to get the location and
-    coordinate data if geo data is turned on by the user. I couldn't find any documentation or code for tweepy to
-    extract the values from the place object so I had to write these somewhat questionable implementations.
-    """
+        return [' '.join(filter(None, find_words(tweet))) for tweet in tweets]
 
     @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
-    def retrieveLocation(locString):
+    def retrievePlaceName(place):
+        """
+        Return the name of a tweet's place, e.g. "Fort Wayne" for the place with the full name "Fort Wayne, IN".
+        The place is a tweepy Place object, or the place dictionary of a raw status.
+        """
+        if isinstance(place, dict):
+            name = place.get('name') or place.get('full_name')
+        else:
+            name = getattr(place, 'name', None) or getattr(place, 'full_name', None)
 
-        try:
-            list_of_values = str(locString).split(",")  # Split the string by a ",".
-            unformatted_word = list_of_values[5]  # The full_name value of place is at the 6th index.
-            formatted_word = unformatted_word[12:]  # Strip "full_name='" (first 12 letters) from full_name value.
-        except:
-            print("Error stripping down Place object data to location")
+        if not isinstance(name, str) or name == "":
+            print("Error reading the name of a Place object")
             return "placeDataInvalid"
 
-        return formatted_word # Example returned data: California.
+        return name
 
-    @staticmethod  # Method is static as it alters no values of the self object.
-    def retrieveCoords(coordsString):
+    @staticmethod  # Method is static as it neither accesses nor alters any values or behaviour of the self object.
+    def retrieveCoordinates(coordinates):
+        """
+        Return the (longitude, latitude) numbers of a tweet's coordinates, a GeoJSON point such as
+        {'type': 'Point', 'coordinates': [-86.4716, 40.0521]}, or (None, None) if they can not be read.
+        """
         try:
-            formatted_word = coordsString[33:-1]  # Strip the first 33 characters and last character from the string.
-        except:
-            print("Error stripping down Place object data to location")
-            return "coordDataInvalid"
-
-        return formatted_word  # Example returned data: [-86.4716, 40.0521].
+            point = coordinates['coordinates'] if isinstance(coordinates, dict) else coordinates.coordinates
+            longitude, latitude = float(point[0]), float(point[1])
+        except (AttributeError, KeyError, IndexError, TypeError, ValueError):
+            print("Error reading the longitude and latitude of a coordinates object")
+            return None, None
 
-    # Hacks end.
+        return longitude, latitude
@@ -1,6 +1,6 @@
 """
 Author:                 Nathan Dunne
-Date last modified:     16/11/2018
+Date last modified:     18/10/2026
 Purpose:                Fetch twitter data based on a search term, generate CSV and JSON files to store data, display
                         sentiment analysis and selected+formatted data frame as per assignment as a table.
 Convention:             This program adheres to the PEP8 Python programming convention throughout.
@@ -9,10 +9,23 @@ Convention:             This program adheres to the PEP8 Python programming conv
 
 # Local file imports.
 import TwitterInterface  # The local class used for fetching and cleaning tweets.
+import ReplaySource  # The local class used for replaying recorded tweets in place of fetching them.
 import FileGenerator  # The local class used for generating CSV and JSON files.
 import DataFrameDisplayFormat  # The local class used for making, formatting and displaying data frames.
 import SentimentAnalysis  # The local class used for sentiment analysis.
+import SentimentCache  # The local class used for remembering the sentiment of already analysed tweets.
+import TweetStore  # The local class used for keeping tweets and their sentiment in a local database.
+import TopTweets  # The local class used for keeping the most favourited tweets while tweets are streamed.
+import SentimentTimeline  # The local class used for keeping per minute and per hour sentiment counts between runs.
+import GeoSentiment  # The local class used for counting sentiment per place and per longitude/latitude grid cell.
+import SearchTermWatch  # The local class used for remembering what was fetched for a search term between polls.
+import RateLimitScheduler  # The local class used for sharing the twitter rate limit between search terms.
+import StageProfiler  # The local class used for timing the stages of a run and reporting them.
+import os  # Required for measuring the size of the files written.
+import time  # Required for waiting between polls in watch mode.
 import sys  # Required for accessing parameters passed in from a console.
+import argparse  # Required for parsing the parameters and flags passed in from a console.
+from concurrent.futures import ThreadPoolExecutor  # Used to fetch several search terms at once.
 
 
 def main():
@@ -21,39 +34,318 @@ def main():
     displaying the information pertaining to the data. Parameters: string(search_term), int(amount_of_observations),
     boolean(exclude_retweets)
     """
-    arguments = sys.argv[1:]  # The arguments are at the first position in the argument vector.
-    argument_amt = len(arguments)  # Knowing the amount of arguments helps to check if the input is valid.
+    arguments = parseArguments(sys.argv[1:])  # The arguments start at the first position in the argument vector.
 
     # Preset parameters.
     search_term = "Automation"
     amount_of_observations = 500
     exclude_retweets = True  # Can set to false to include retweets.
 
+    # Knowing the amount of positional arguments helps to check if the input is valid.
+    positional_arguments = [argument for argument in (arguments.search_term,
+                                                      arguments.amount_of_observations,
+                                                      arguments.exclude_retweets) if argument is not None]
+    argument_amt = len(positional_arguments)
+
     # If arguments are passed in and if there is not the correct amount of arguments.
     if argument_amt > 0 and argument_amt != 3:
         print("Invalid argument amount, using preset parameters.")
     elif argument_amt > 0:  # If we have arguments, use them as parameters when fetching tweets.
         try:
-            search_term = str(sys.argv[1])
-            amount_of_observations = int(sys.argv[2])
-            exclude_retweets = bool(int(sys.argv[3]))
+            search_term = str(positional_arguments[0])
+            amount_of_observations = int(positional_arguments[1])
+            exclude_retweets = bool(int(positional_arguments[2]))
         except ValueError:  # Catch invalid values.
             print("Value Error, using preset parameters.")
             search_term = "Automation"
             amount_of_observations = 500
             exclude_retweets = True
 
-    # Generate a data set based on a search term, amount of tweets and with the option of excluding retweets.
-    twitter_data_set = generateDataSet(search_term, amount_of_observations, exclude_retweets)
-
-    # Generate a CSV and JSON file based on the acquired data set.
-    generateFiles(twitter_data_set, search_term)
-
     # The assignment calls for the top 10 favourited tweets, this value dictates how many to print out from the head.
     row_amount_from_head = 10
 
-    # Display the required data in line with the assignment.
-    displayAssignmentData(twitter_data_set, row_amount_from_head)
+    # Remember analysed tweet texts, between runs too if a cache file is given.
+    sentiment_cache = SentimentCache.SentimentCache(arguments.cache_size, arguments.cache_file)
+
+    # Several search terms can be given with --terms, each is fetched with the same parameters into its own files.
+    search_terms = arguments.terms or [search_term]
+
+    # Every fetch takes its search requests from one shared rate limit, so fetches running at once never exceed it.
+    rate_limit_scheduler = RateLimitScheduler.RateLimitScheduler()
+
+    # Time each stage of the run, reported with --report.
+    profiler = StageProfiler.StageProfiler(arguments.profile_stage, arguments.profile_file)
+
+    # Tweets are fetched from twitter unless a file of recorded tweets is given to replay.
+    with profiler.stage("authenticate"):
+        data_source = createDataSource(arguments.replay, arguments.replay_rate, rate_limit_scheduler)
+
+    if arguments.watch is not None:
+        # Keep polling the search terms for new tweets, with the same authenticated source and warm scorer.
+        watchAssignmentData(search_terms, amount_of_observations, exclude_retweets, row_amount_from_head,
+                            arguments.watch, arguments.watch_polls, arguments.workers, arguments.chunk_size,
+                            sentiment_cache, data_source, arguments.formats or ['csv', 'jsonl'], arguments.scorer,
+                            arguments.timeline, arguments.geo, arguments.geo_region, profiler)
+    elif len(search_terms) == 1:
+        runSearchTerm(search_terms[0], amount_of_observations, exclude_retweets, row_amount_from_head, arguments,
+                      sentiment_cache, data_source, profiler)
+    else:
+        # Fetch the search terms at once, so one can fetch while another waits on the rate limit.
+        threads = arguments.threads or min(len(search_terms), 8)
+
+        print("Fetching " + str(len(search_terms)) + " search terms with " + str(threads) + " threads.")
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            term_runs = [executor.submit(runSearchTerm, each_search_term, amount_of_observations, exclude_retweets,
+                                         row_amount_from_head, arguments, sentiment_cache, data_source, profiler)
+                         for each_search_term in search_terms]
+
+            for each_search_term, term_run in zip(search_terms, term_runs):
+                try:
+                    term_run.result()
+                except Exception as error:  # One failed search term should not lose the results of the others.
+                    print("Error fetching search term " + each_search_term + ": " + str(error))
+
+        print("Made " + str(rate_limit_scheduler.requests) + " search requests, waiting "
+              + str(round(rate_limit_scheduler.wait_seconds, 1)) + " seconds on the rate limit.")
+
+    sentiment_cache.save()  # Only saved if a cache file was given.
+
+    if arguments.report is not None:
+        # Fetch stages include the time spent waiting on the rate limit, which is also counted on its own.
+        profiler.count("search_requests", rate_limit_scheduler.requests)
+        profiler.count("rate_limit_wait_seconds", rate_limit_scheduler.wait_seconds)
+        profiler.count("sentiment_cache_hits", sentiment_cache.hits)
+        profiler.count("sentiment_cache_misses", sentiment_cache.misses)
+
+        profiler.writeReport(arguments.report)
+    else:
+        profiler.saveProfile()  # Only saved if a stage was profiled.
+
+
+def runSearchTerm(search_term, amount_of_observations, exclude_retweets, row_amount, arguments, sentiment_cache,
+                  data_source, profiler=None):
+    """
+    runSearchTerm() fetches, stores and displays the data of one search term, in the mode chosen in the arguments.
+    The stages are timed with the optional profiler.
+    """
+    if profiler is None:
+        profiler = StageProfiler.StageProfiler()
+
+    # Per minute and per hour sentiment counts of the search term, added to those saved by earlier runs.
+    timeline = None
+
+    if arguments.timeline and not arguments.files_only:
+        timeline = SentimentTimeline.SentimentTimeline(search_term + "SentimentTimeline.json")
+
+    # Sentiment counts of the search term per place and per grid cell.
+    geo_sentiment = None
+
+    if arguments.geo and not arguments.files_only:
+        geo_sentiment = GeoSentiment.GeoSentiment(arguments.geo_region)
+
+    runSearchTermMode(search_term, amount_of_observations, exclude_retweets, row_amount, arguments, sentiment_cache,
+                      data_source, profiler, timeline, geo_sentiment)
+
+    if timeline is not None:
+        timeline.displayTimeline('hour')
+        timeline.save()
+
+    if geo_sentiment is not None:
+        geo_sentiment.displayGeoSentiment(row_amount)
+
+
+def runSearchTermMode(search_term, amount_of_observations, exclude_retweets, row_amount, arguments, sentiment_cache,
+                      data_source, profiler, timeline, geo_sentiment=None):
+    """
+    runSearchTermMode() runs the store, stream or default mode for one search term, as chosen in the arguments.
+    """
+    if arguments.store is not None:
+        # Fetch only tweets newer than those stored, analyse only unanalysed tweets and report from the store.
+        # Fetching, analysing and writing are interleaved, so the store and stream modes are timed as one stage.
+        file_formats = arguments.formats or ['csv', 'jsonl']
+
+        with profiler.stage("store"):
+            tweet_amount = storeAssignmentData(arguments.store, search_term, amount_of_observations, exclude_retweets,
+                                               row_amount, arguments.workers, arguments.chunk_size, sentiment_cache,
+                                               data_source, file_formats, arguments.scorer, timeline, geo_sentiment)
+
+        profiler.count("tweets_fetched", tweet_amount)
+        countBytesWritten(profiler, search_term, appendableFileFormats(file_formats, False))
+    elif arguments.stream:
+        # Fetch, clean, analyse and append tweets to the files as they arrive, keeping memory use bounded.
+        file_formats = arguments.formats or ['csv', 'jsonl']
+
+        with profiler.stage("stream"):
+            if arguments.files_only:
+                tweet_amount = streamFiles(search_term, amount_of_observations, exclude_retweets, arguments.chunk_size,
+                                           data_source, file_formats)
+            else:
+                tweet_amount = streamAssignmentData(search_term, amount_of_observations, exclude_retweets, row_amount,
+                                                    arguments.workers, arguments.chunk_size, sentiment_cache,
+                                                    data_source, file_formats, arguments.scorer, timeline,
+                                                    geo_sentiment)
+
+        profiler.count("tweets_fetched", tweet_amount)
+        countBytesWritten(profiler, search_term, appendableFileFormats(file_formats, False))
+    else:
+        # Generate a data set based on a search term, amount of tweets and with the option of excluding retweets.
+        twitter_data_set = generateDataSet(search_term, amount_of_observations, exclude_retweets, data_source,
+                                           profiler)
+
+        # Generate a CSV and JSON file, or the chosen file formats, based on the acquired data set.
+        generateFiles(twitter_data_set, search_term, arguments.formats or ['csv', 'json'], profiler)
+
+        if arguments.files_only:  # Sentiment analysis and the table are skipped, along with importing their libraries.
+            return
+
+        # Display the required data in line with the assignment.
+        displayAssignmentData(twitter_data_set, row_amount, arguments.workers, arguments.chunk_size, sentiment_cache,
+                              profiler, arguments.scorer, timeline, geo_sentiment)
+
+
+def parseArguments(arguments):
+    """
+    parseArguments() reads the three optional positional parameters and the optional flags from the argument vector.
+    The positional parameters are validated by main() so that invalid input falls back to the preset parameters.
+    """
+    parser = argparse.ArgumentParser(description="Fetch tweets for a search term, store them as CSV and JSON files "
+                                                 "and display their sentiment and most favourited tweets.")
+
+    parser.add_argument("search_term", nargs="?", help="Search term e.g Pokemon.")
+    parser.add_argument("amount_of_observations", nargs="?", help="Amount of twitter observations to fetch.")
+    parser.add_argument("exclude_retweets", nargs="?", help="1 to exclude retweets, 0 to include them.")
+
+    parser.add_argument("--terms", nargs="+", default=None,
+                        help="Several search terms to fetch at once, each into its own files. Replaces the search "
+                             "term parameter.")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Search terms fetched at once with --terms (default: one per term, at most 8).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes used for sentiment analysis, 0 uses one per CPU (default: 1).")
+    parser.add_argument("--chunk-size", type=int, default=250,
+                        help="Most tweets handed to a sentiment analysis process at a time, streamed and stored "
+                             "batches of this size are split across the processes (default: 250).")
+    parser.add_argument("--scorer", choices=SentimentAnalysis.SentimentAnalysis.scorers, default='textblob',
+                        help="Sentiment scorer: textblob scores one tweet at a time, lexicon scores whole batches "
+                             "with NumPy using TextBlob's lexicon, giving the same labels (default: textblob).")
+    parser.add_argument("--cache-size", type=int, default=100000,
+                        help="Analysed tweet texts remembered by the sentiment cache, 0 disables it (default: 100000).")
+    parser.add_argument("--cache-file", default=None,
+                        help="JSON file the sentiment cache is loaded from and saved to between runs.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Analyse and append tweets to the CSV and JSON lines files as they are fetched.")
+    parser.add_argument("--formats", type=parseFileFormats, default=None,
+                        help="Comma separated file formats to create, from: " +
+                             ", ".join(FileGenerator.FileGenerator.file_formats) + " (default: csv,json, or "
+                             "csv,jsonl with --stream or --store, which only create formats that can be appended to).")
+    parser.add_argument("--store", default=None,
+                        help="SQLite database file tweets and their sentiment are kept in between runs, e.g. "
+                             "tweetStore.db. Only tweets newer than those stored are fetched.")
+    parser.add_argument("--replay", default=None,
+                        help="Replay recorded tweets from a JSON file made by this program or a JSON lines file of "
+                             "raw status objects, instead of fetching from twitter.")
+    parser.add_argument("--replay-rate", type=float, default=0,
+                        help="Tweets replayed per second to simulate the twitter API, including its search rate "
+                             "limit. 0 is full speed with no rate limit (default: 0).")
+    parser.add_argument("--timeline", action="store_true",
+                        help="Keep per minute and per hour sentiment counts, by tweets and weighted by favourites and "
+                             "retweets, in a JSON file per search term that each run adds to, e.g. "
+                             "AutomationSentimentTimeline.json. Tweets counted by an earlier run are skipped.")
+    parser.add_argument("--geo", action="store_true",
+                        help="Display the sentiment of the places and the 1 degree longitude/latitude grid cells "
+                             "with the most tweets. Only tweets with geo data turned on have a place or coordinates.")
+    parser.add_argument("--geo-region", type=parseGeoRegion, default=None, metavar="WEST,SOUTH,EAST,NORTH",
+                        help="Only count the grid cells of tweets with coordinates in this box, e.g. -125,24,-66,50 "
+                             "for the mainland United States. Implies --geo.")
+    parser.add_argument("--watch", type=float, default=None, metavar="SECONDS",
+                        help="Keep running, polling each search term for new tweets every SECONDS, appending them to "
+                             "the files and updating the sentiment and table, until stopped with Ctrl+C.")
+    parser.add_argument("--watch-polls", type=int, default=None,
+                        help="Stop watching after this many polls (default: keep polling).")
+    parser.add_argument("--files-only", action="store_true",
+                        help="Only fetch tweets and write the files, without sentiment analysis or the table, so "
+                             "tabulate and textblob are never imported, nor pandas unless a parquet or feather file "
+                             "is written.")
+    parser.add_argument("--report", default=None,
+                        help="JSON file to write the wall and CPU time of each stage and the run counters to, - "
+                             "prints it instead.")
+    parser.add_argument("--profile-stage", default=None,
+                        help="Stage to profile with cProfile, e.g. fetch, sentiment or write_csv. The statistics are "
+                             "saved with or without --report.")
+    parser.add_argument("--profile-file", default=None,
+                        help="File the cProfile statistics are saved to (default: the stage name with .prof).")
+
+    parsed_arguments = parser.parse_args(arguments)
+
+    if parsed_arguments.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1.")
+
+    if parsed_arguments.workers < 0:
+        parser.error("--workers must be 0, for one per CPU, or more.")
+
+    if parsed_arguments.cache_size < 0:
+        parser.error("--cache-size must be 0, to disable the sentiment cache, or more.")
+
+    if parsed_arguments.threads is not None and parsed_arguments.threads < 1:
+        parser.error("--threads must be at least 1.")
+
+    if parsed_arguments.files_only and parsed_arguments.store is not None:
+        parser.error("--files-only can not be used with --store, which analyses the stored tweets.")
+
+    if parsed_arguments.watch is not None and (parsed_arguments.store is not None or parsed_arguments.files_only):
+        parser.error("--watch keeps its own state between polls and can not be used with --store or --files-only.")
+
+    if parsed_arguments.geo_region is not None:
+        parsed_arguments.geo = True
+
+    if parsed_arguments.workers == 0:  # SentimentAnalysis takes None to mean one process per CPU.
+        parsed_arguments.workers = None
+
+    return parsed_arguments
+
+
+def parseFileFormats(file_formats):
+    """
+    parseFileFormats() turns a comma separated text of file formats into a list, checking each is a known format.
+    """
+    file_formats = [file_format.strip().lower() for file_format in file_formats.split(",") if file_format.strip()]
+
+    for file_format in file_formats:
+        if file_format not in FileGenerator.FileGenerator.file_formats:
+            raise argparse.ArgumentTypeError("unknown file format: " + file_format)
+
+    return file_formats
+
+
+def parseGeoRegion(geo_region):
+    """
+    parseGeoRegion() turns a comma separated text of the west, south, east and north edges of a region, in degrees,
+    into a (min_longitude, min_latitude, max_longitude, max_latitude) tuple.
+    """
+    try:
+        west, south, east, north = (float(edge) for edge in geo_region.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected west,south,east,north in degrees: " + geo_region)
+
+    if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+        raise argparse.ArgumentTypeError("region edges out of order or range: " + geo_region)
+
+    return west, south, east, north
+
+
+def appendableFileFormats(file_formats, show_skipped=True):
+    """
+    appendableFileFormats() returns the file formats that can be appended to as tweets are streamed in, noting any
+    that are skipped.
+    """
+    skipped_formats = [file_format for file_format in file_formats
+                       if file_format not in FileGenerator.FileGenerator.appendable_formats]
+
+    if len(skipped_formats) > 0 and show_skipped:
+        print("Skipping file formats that can not be appended to: " + ", ".join(skipped_formats))
+
+    return [file_format for file_format in file_formats if file_format not in skipped_formats]
 
 
 def setPresets():
@@ -62,55 +354,564 @@ def setPresets():
     exclude_retweets = True
 
 
-def generateDataSet(search_term, amount_of_observations, exclude_retweets):
+def createDataSource(replay_file_name=None, replay_rate=0, rate_limit_scheduler=None):
+    """
+    createDataSource() returns the object tweets are fetched from. This is a ReplaySource if a file of recorded tweets
+    is given, otherwise a TwitterInterface authenticated with twitter. A TwitterInterface takes a token from the
+    optional rate_limit_scheduler before each search request, a ReplaySource only when simulating the twitter API with
+    a replay_rate above 0, so a full speed replay is never held up by the rate limit.
+    """
+    if replay_file_name is not None:
+        # Instantiate ReplaySource object.
+        return ReplaySource.ReplaySource(replay_file_name, replay_rate,
+                                         rate_limit_scheduler if replay_rate > 0 else None)
+
+    return TwitterInterface.TwitterInterface(rate_limit_scheduler)  # Instantiate TwitterInterface object.
+
+
+def generateDataSet(search_term, amount_of_observations, exclude_retweets, data_source=None, profiler=None):
     """
-    generateDataSet() will use the parameters to retrieve tweet observations from twitter and store them in a list of
-    dictionaries to return.
+    generateDataSet() will use the parameters to retrieve tweet observations from twitter, or the given data_source,
+    and store them in a list of dictionaries to return. The fetch, which includes cleaning the tweets and waiting on
+    the rate limit, is timed with the optional profiler.
     """
+    if profiler is None:
+        profiler = StageProfiler.StageProfiler()
 
-    twitter_interface = TwitterInterface.TwitterInterface()  # Instantiate TwitterInterface object.
+    if data_source is None:
+        with profiler.stage("authenticate"):
+            data_source = createDataSource()
 
     # Fetch an amount of twitter observations based on a search term, possibly excluding retweets.
-    twitter_data_set = twitter_interface.fetchTweets(search_term, amount_of_observations, exclude_retweets)
+    with profiler.stage("fetch"):
+        twitter_data_set = data_source.fetchTweets(search_term, amount_of_observations, exclude_retweets)
+
+    profiler.count("tweets_fetched", len(twitter_data_set))
 
     return twitter_data_set
 
 
-def generateFiles(data_set, search_term):
+def generateFiles(data_set, search_term, file_formats=('csv', 'json'), profiler=None):
     """
-    generateFiles() uses the data_set from generateDataSet() to create CSV and JSON files, named with the search term.
+    generateFiles() uses the data_set from generateDataSet() to create CSV and JSON files, or files of the given
+    file_formats, named with the search term. Writing each file is timed with the optional profiler.
     """
+    if profiler is None:
+        profiler = StageProfiler.StageProfiler()
 
     file_generator = FileGenerator.FileGenerator()  # Instantiate FileGenerator object.
 
-    csv_file_name = search_term + "twitterDataCSV"  # Name the csv file.
-    json_file_name = search_term + "twitterDataJSON"  # Name the json file.
+    # Create a file of each format with the given data set, named with the search term.
+    for file_format in file_formats:
+        with profiler.stage("write_" + file_format):
+            file_generator.createFiles(data_set, search_term, [file_format])
+
+    countBytesWritten(profiler, search_term, file_formats)
+
+
+def countBytesWritten(profiler, search_term, file_formats):
+    """
+    countBytesWritten() adds the size of the files of a search term in each of the file_formats to the profiler.
+    """
+    for file_format in file_formats:
+        filename = FileGenerator.FileGenerator.fileName(search_term, file_format) + "." + file_format
 
-    file_generator.createCSV(data_set, csv_file_name)  # Create csv file with the given data set and filename.
-    file_generator.createJSON(data_set, json_file_name)  # Create json file with the given data set and filename.
+        if os.path.exists(filename):  # Formats needing a library that is not installed are not made.
+            profiler.count("bytes_written", os.path.getsize(filename))
 
 
-def displayAssignmentData(twitter_data_set, row_amount):
+def displayAssignmentData(twitter_data_set, row_amount, workers=1, chunk_size=250, sentiment_cache=None,
+                          profiler=None, scorer='textblob', timeline=None, geo_sentiment=None):
     """
-    displayAssignmentData() uses the data_set from generateDataSet() to create a data frame which can then be
-    formatted and sorted. The data frame is then analysed for sentiment and the results are displayed. Finally, the data
-    frame is used with tabulate to format and display an orderly table.
+    displayAssignmentData() uses the data_set from generateDataSet() to create a data frame which is analysed for
+    sentiment and the results are displayed. The data frame is then formatted and only the top row_amount rows are
+    selected and sorted. Finally, the data frame is used with tabulate to format and display an orderly table.
+    Sentiment analysis is spread across an amount of worker processes, chunk_size tweets at a time, skipping tweets
+    already held by the sentiment_cache, with the given sentiment scorer. Each step is timed with the optional profiler.
+    The sentiment of each tweet is added to the optional SentimentTimeline and GeoSentiment.
     """
+    if profiler is None:
+        profiler = StageProfiler.StageProfiler()
+
     data_display_format = DataFrameDisplayFormat.DataFrameDisplayFormat()  # Instantiate FileGenerator object.
 
     # Convert the data set to a data frame.
-    twitter_data_frame = data_display_format.convertDataSetToDataFrame(twitter_data_set)
+    with profiler.stage("build_data_frame"):
+        twitter_data_frame = data_display_format.convertDataSetToDataFrame(twitter_data_set)
+
+    # Instantiate SentimentAnalysis object.
+    sentiment_analysis = SentimentAnalysis.SentimentAnalysis(workers, chunk_size, sentiment_cache, scorer)
+
+    # Display sentiment analysis results of every tweet, before only the displayed rows are selected.
+    with profiler.stage("sentiment"):
+        sentiments = sentiment_analysis.displaySentimentPercentages(twitter_data_frame)
+
+    sentiment_analysis.close()  # Shut down the worker processes, every tweet has been analysed.
 
-    # Format the frame, sorting columns and rows.
-    twitter_data_frame = data_display_format.formatDataFrame(twitter_data_frame)
+    if timeline is not None:
+        with profiler.stage("timeline"):
+            timeline.addTweets(twitter_data_set, sentiments)
 
-    sentiment_analysis = SentimentAnalysis.SentimentAnalysis()  # Instantiate SentimentAnalysis object.
+    if geo_sentiment is not None:
+        with profiler.stage("geo"):
+            geo_sentiment.addTweets(twitter_data_set, sentiments)
 
-    sentiment_analysis.displaySentimentPercentages(twitter_data_frame)  # Display sentiment analysis results.
+    if sentiment_cache is not None:
+        sentiment_cache.displayStatistics()  # Display how many tweets were already analysed.
+
+    # Format the frame, selecting and sorting only the rows that are displayed.
+    with profiler.stage("format_data_frame"):
+        twitter_data_frame = data_display_format.formatDataFrame(twitter_data_frame, row_amount)
 
     show_index = True  # Set to show index numbers.
     # Display formatted data frame using an amount of rows.
-    data_display_format.displayDataFrame(twitter_data_frame, row_amount, show_index)
+    with profiler.stage("display_table"):
+        data_display_format.displayDataFrame(twitter_data_frame, row_amount, show_index)
+
+
+def streamAssignmentData(search_term, amount_of_observations, exclude_retweets, row_amount, workers=1,
+                         chunk_size=250, sentiment_cache=None, data_source=None, file_formats=('csv', 'jsonl'),
+                         scorer='textblob', timeline=None, geo_sentiment=None):
+    """
+    streamAssignmentData() fetches tweets one at a time, analysing and appending them to a CSV and a JSON lines file,
+    or files of the given file_formats that can be appended to, chunk_size tweets at a time. Only the current chunk,
+    the sentiment counts and the row_amount most favourited tweets are kept in memory, and the files hold every tweet
+    fetched so far if the program stops part way. Each tweet is added to the optional SentimentTimeline and
+    GeoSentiment.
+    Returns the amount of tweets fetched.
+    """
+    if data_source is None:
+        data_source = createDataSource()
+
+    file_generator = FileGenerator.FileGenerator()  # Instantiate FileGenerator object.
+
+    # Instantiate SentimentAnalysis object.
+    sentiment_analysis = SentimentAnalysis.SentimentAnalysis(workers, chunk_size, sentiment_cache, scorer)
+
+    file_formats = appendableFileFormats(file_formats)
+
+    for file_format in file_formats:
+        print("Streaming to " + file_format + " file: " + file_generator.fileName(search_term, file_format))
+
+    sentiment_counts = {1: 0, 0: 0, -1: 0}  # Amount of positive, neutral and negative tweets.
+    top_tweets = TopTweets.TopTweets(row_amount)  # The most favourited tweets fetched so far.
+    tweet_amount = 0
+
+    tweet_chunk = []
+    start_file = True  # The files are started over by the first chunk and appended to by the rest.
+
+    for tweet in data_source.streamTweets(search_term, amount_of_observations, exclude_retweets):
+        tweet_chunk.append(tweet)
+
+        if len(tweet_chunk) < chunk_size:
+            continue
+
+        tweet_amount += processTweetChunk(tweet_chunk, search_term, file_generator, file_formats, sentiment_analysis,
+                                          start_file, sentiment_counts, top_tweets, timeline, geo_sentiment)
+        tweet_chunk = []
+        start_file = False
+
+    # Process the last, possibly partial, chunk.
+    tweet_amount += processTweetChunk(tweet_chunk, search_term, file_generator, file_formats, sentiment_analysis,
+                                      start_file, sentiment_counts, top_tweets, timeline, geo_sentiment)
+
+    sentiment_analysis.close()  # The same worker processes analysed every chunk.
+
+    print("Fetched " + str(tweet_amount) + " observations.")
+
+    print("\nProcessing Sentiment Analysis")
+    sentiment_analysis.displaySentimentCounts(sentiment_counts[1], sentiment_counts[0], sentiment_counts[-1])
+
+    if sentiment_cache is not None:
+        sentiment_cache.displayStatistics()  # Display how many tweets were already analysed.
+
+    displayTopTweets(top_tweets.rankedTweets(), row_amount)
+
+    return tweet_amount
+
+
+def streamFiles(search_term, amount_of_observations, exclude_retweets, chunk_size=250, data_source=None,
+                file_formats=('csv', 'jsonl')):
+    """
+    streamFiles() fetches tweets one at a time and appends them to a CSV and a JSON lines file, or files of the given
+    file_formats that can be appended to, chunk_size tweets at a time, without analysing or displaying them.
+    Returns the amount of tweets fetched.
+    """
+    if data_source is None:
+        data_source = createDataSource()
+
+    file_generator = FileGenerator.FileGenerator()  # Instantiate FileGenerator object.
+
+    file_formats = appendableFileFormats(file_formats)
+
+    for file_format in file_formats:
+        print("Streaming to " + file_format + " file: " + file_generator.fileName(search_term, file_format))
+
+    tweet_amount = 0
+    tweet_chunk = []
+    start_file = True  # The files are started over by the first chunk and appended to by the rest.
+
+    for tweet in data_source.streamTweets(search_term, amount_of_observations, exclude_retweets):
+        tweet_chunk.append(tweet)
+
+        if len(tweet_chunk) < chunk_size:
+            continue
+
+        file_generator.appendFiles(tweet_chunk, search_term, file_formats, start_file)
+        tweet_amount += len(tweet_chunk)
+        tweet_chunk = []
+        start_file = False
+
+    # Append the last, possibly partial, chunk.
+    file_generator.appendFiles(tweet_chunk, search_term, file_formats, start_file)
+    tweet_amount += len(tweet_chunk)
+
+    print("Fetched " + str(tweet_amount) + " observations.")
+
+    return tweet_amount
+
+
+def watchAssignmentData(search_terms, amount_of_observations, exclude_retweets, row_amount, interval, poll_amount=None,
+                        workers=1, chunk_size=250, sentiment_cache=None, data_source=None,
+                        file_formats=('csv', 'jsonl'), scorer='textblob', timeline=False, geo=False, geo_region=None,
+                        profiler=None):
+    """
+    watchAssignmentData() polls each search term every interval seconds, until stopped or poll_amount polls are made.
+    The data source is authenticated and the sentiment scorer loaded once, and each poll only fetches tweets newer
+    than those already fetched, up to amount_of_observations. New tweets are appended to the files of the given
+    file_formats that can be appended to, and the sentiment percentages and the table of the row_amount most
+    favourited tweets are updated from counts kept between polls, without reading back earlier tweets.
+    If timeline is True each search term's SentimentTimeline file is added to and saved after each poll, and if geo is
+    True the sentiment per place and per grid cell, limited to the optional geo_region, is displayed after each poll.
+    """
+    if data_source is None:
+        data_source = createDataSource()
+
+    if profiler is None:
+        profiler = StageProfiler.StageProfiler()
+
+    file_generator = FileGenerator.FileGenerator()  # Instantiate FileGenerator object.
+
+    # Instantiate SentimentAnalysis object, once for every poll, so its worker processes are kept between polls.
+    sentiment_analysis = SentimentAnalysis.SentimentAnalysis(workers, chunk_size, sentiment_cache, scorer)
+
+    with profiler.stage("load_scorer"):
+        sentiment_analysis.warmUp()  # Load the scorer's libraries and lexicon, and start its workers, before polling.
+
+    file_formats = appendableFileFormats(file_formats)
+
+    watches = [SearchTermWatch.SearchTermWatch(search_term, row_amount,
+                                               SentimentTimeline.SentimentTimeline(
+                                                   search_term + "SentimentTimeline.json") if timeline else None,
+                                               GeoSentiment.GeoSentiment(geo_region) if geo else None)
+               for search_term in search_terms]
+
+    print("Watching " + ", ".join(search_terms) + ", polling every " + str(interval) + " seconds. Ctrl+C stops.")
+
+    polls = 0
+
+    try:
+        while poll_amount is None or polls < poll_amount:
+            poll_start = time.monotonic()
+
+            for watch in watches:
+                with profiler.stage("poll"):
+                    new_tweet_amount = pollSearchTerm(watch, amount_of_observations, exclude_retweets, row_amount,
+                                                      chunk_size, data_source, file_generator, file_formats,
+                                                      sentiment_analysis, sentiment_cache)
+
+                profiler.count("tweets_fetched", new_tweet_amount)
+
+            if sentiment_cache is not None:
+                sentiment_cache.save()  # Saved after each poll, so it is kept if the watch is stopped.
+
+            polls += 1
+
+            if poll_amount is not None and polls >= poll_amount:
+                break
+
+            # Wait out the rest of the interval, the time taken by the poll counts towards it.
+            time.sleep(max(0.0, interval - (time.monotonic() - poll_start)))
+    except KeyboardInterrupt:
+        print("\nStopped watching after " + str(polls) + " polls.")
+    finally:
+        sentiment_analysis.close()
+
+        # The files hold every tweet of every poll, so their sizes are counted once the watch ends.
+        for search_term in search_terms:
+            countBytesWritten(profiler, search_term, file_formats)
+
+
+def pollSearchTerm(watch, amount_of_observations, exclude_retweets, row_amount, chunk_size, data_source,
+                   file_generator, file_formats, sentiment_analysis, sentiment_cache=None):
+    """
+    pollSearchTerm() fetches the tweets of a watched search term that are newer than those already fetched, or that
+    an earlier capped poll did not reach, appends them to the files, chunk_size tweets at a time, and displays the
+    updated sentiment percentages and table.
+    Returns the amount of new tweets fetched.
+    """
+    watch.poll_amount += 1
+
+    print("\nPoll " + str(watch.poll_amount) + " of " + watch.search_term +
+          ("" if watch.since_id is None else ", tweets newer than id " + str(watch.since_id)))
+
+    new_tweet_amount = 0
+    tweet_chunk = []
+
+    for tweet in streamNewTweets(data_source, watch.search_term, amount_of_observations, exclude_retweets,
+                                 watch.since_id, watch.fetch_gaps):
+        tweet_chunk.append(tweet)
+
+        if len(tweet_chunk) < chunk_size:
+            continue
+
+        new_tweet_amount += processWatchedChunk(watch, tweet_chunk, file_generator, file_formats, sentiment_analysis)
+        tweet_chunk = []
+
+    new_tweet_amount += processWatchedChunk(watch, tweet_chunk, file_generator, file_formats, sentiment_analysis)
+
+    print("Fetched " + str(new_tweet_amount) + " new observations, " + str(watch.tweet_amount) + " in total.")
+
+    if new_tweet_amount == 0:  # Nothing has changed since the last poll.
+        return 0
+
+    print("\nProcessing Sentiment Analysis")
+    sentiment_analysis.displaySentimentCounts(watch.sentiment_counts[1], watch.sentiment_counts[0],
+                                              watch.sentiment_counts[-1])
+
+    if sentiment_cache is not None:
+        sentiment_cache.displayStatistics()  # Display how many tweets were already analysed.
+
+    displayTopTweets(watch.top_tweets.rankedTweets(), row_amount)
+
+    if watch.timeline is not None:
+        watch.timeline.displayTimeline('hour')
+        watch.timeline.save()
+
+    if watch.geo_sentiment is not None:
+        watch.geo_sentiment.displayGeoSentiment(row_amount)
+
+    return new_tweet_amount
+
+
+def processWatchedChunk(watch, tweet_chunk, file_generator, file_formats, sentiment_analysis):
+    """
+    processWatchedChunk() processes a chunk of a watched search term's new tweets, starting the files over on the
+    first poll, and notes the chunk's tweets so later polls fetch only newer tweets.
+    Returns the amount of tweets in the chunk.
+    """
+    if len(tweet_chunk) == 0 and not watch.start_file:  # Nothing to append.
+        return 0
+
+    tweet_amount = processTweetChunk(tweet_chunk, watch.search_term, file_generator, file_formats, sentiment_analysis,
+                                     watch.start_file, watch.sentiment_counts, watch.top_tweets, watch.timeline,
+                                     watch.geo_sentiment)
+
+    watch.recordTweets(tweet_chunk)
+    watch.start_file = False
+
+    return tweet_amount
+
+
+def processTweetChunk(tweet_chunk, search_term, file_generator, file_formats, sentiment_analysis, start_file,
+                      sentiment_counts, top_tweets, timeline=None, geo_sentiment=None):
+    """
+    processTweetChunk() appends a chunk of streamed tweets to the files, adds their sentiment to the sentiment_counts
+    and the optional timeline and geo_sentiment, and offers them to top_tweets, which keeps the most favourited tweets
+    seen so far.
+    Returns the amount of tweets in the chunk.
+    """
+    file_generator.appendFiles(tweet_chunk, search_term, file_formats, start_file)
+
+    sentiments = sentiment_analysis.analyseSentimentBatch(tweet['text'] for tweet in tweet_chunk)
+
+    for sentiment in sentiments:
+        sentiment_counts[sentiment] += 1
+
+    if timeline is not None:
+        timeline.addTweets(tweet_chunk, sentiments)
+
+    if geo_sentiment is not None:
+        geo_sentiment.addTweets(tweet_chunk, sentiments)
+
+    top_tweets.addAll(tweet_chunk)
+
+    return len(tweet_chunk)
+
+
+def displayTopTweets(top_tweets, row_amount):
+    """
+    displayTopTweets() displays already ranked (index, tweet) pairs as a table, without needing a data frame of every
+    tweet. Only these tweets are turned into a data frame, then formatted and displayed.
+    """
+    if len(top_tweets) == 0:
+        return
+
+    data_display_format = DataFrameDisplayFormat.DataFrameDisplayFormat()  # Instantiate DataFrameDisplayFormat object.
+
+    top_tweet_data_frame = data_display_format.convertDataSetToDataFrame([tweet for index, tweet in top_tweets])
+    top_tweet_data_frame.index = [index for index, tweet in top_tweets]  # Keep the fetched order as the index.
+
+    top_tweet_data_frame = data_display_format.formatDataFrame(top_tweet_data_frame, row_amount)
+
+    show_index = True  # Set to show index numbers.
+    data_display_format.displayDataFrame(top_tweet_data_frame, row_amount, show_index)
+
+
+def streamNewTweets(data_source, search_term, amount_of_observations, exclude_retweets, since_id, fetch_gaps):
+    """
+    streamNewTweets() yields up to amount_of_observations tweets that have not been fetched yet: first those newer
+    than since_id, then, with what is left of the amount, those in the fetch_gaps of earlier fetches. A search returns
+    the newest tweets first, so when the amount runs out before since_id is reached the tweets between since_id and
+    the oldest tweet fetched would be skipped for good. Instead that range is added to fetch_gaps, a list of
+    [since_id, max_id] tweet id ranges that is updated in place, and later fetches page down through it with max_id.
+    """
+    if since_id is None:  # Nothing was fetched before, so there is nothing to fill in.
+        yield from data_source.streamTweets(search_term, amount_of_observations, exclude_retweets)
+        return
+
+    # The new tweets first, then the gaps, oldest first.
+    id_ranges = [[since_id, None]] + fetch_gaps
+    remaining_amount = amount_of_observations
+    remaining_gaps = []
+
+    for range_since_id, range_max_id in id_ranges:
+        if remaining_amount <= 0:  # Left for a later fetch.
+            remaining_gaps.append([range_since_id, range_max_id])
+            continue
+
+        oldest_tweet_id = None
+
+        for tweet in data_source.streamTweets(search_term, remaining_amount, exclude_retweets, range_since_id,
+                                              range_max_id):
+            remaining_amount -= 1
+            tweet_id = int(tweet['tweet_id'])
+
+            if oldest_tweet_id is None or tweet_id < oldest_tweet_id:
+                oldest_tweet_id = tweet_id
+
+            yield tweet
+
+        # The amount ran out part way through the range, the rest of it may still hold tweets.
+        if remaining_amount <= 0 and oldest_tweet_id is not None and oldest_tweet_id - 1 > range_since_id:
+            print("Fetched the amount of " + str(amount_of_observations) + " observations before reaching tweet id " +
+                  str(range_since_id) + ", older tweets up to id " + str(oldest_tweet_id - 1) +
+                  " are left for a later fetch.")
+            remaining_gaps.append([range_since_id, oldest_tweet_id - 1])
+
+    fetch_gaps[:] = sorted(remaining_gaps)
+
+
+def storeAssignmentData(store_file_name, search_term, amount_of_observations, exclude_retweets, row_amount,
+                        workers=1, chunk_size=250, sentiment_cache=None, data_source=None,
+                        file_formats=('csv', 'jsonl'), scorer='textblob', timeline=None, geo_sentiment=None):
+    """
+    storeAssignmentData() keeps tweets in a local database between runs. Only tweets newer than the newest stored tweet
+    of the search term, or older tweets an earlier capped fetch did not reach, are fetched, and only tweets without a
+    stored sentiment are analysed. The CSV and JSON lines
+    files (or files of the given file_formats that can be appended to), the sentiment percentages and the table of most
+    favourited tweets are then made from everything stored. Newly analysed tweets are added to the optional
+    SentimentTimeline, and the optional GeoSentiment is given the counts of everything stored per place and grid cell,
+    grouped by the database from the grid cell stored with each tweet.
+    Returns the amount of tweets fetched, including any that were already stored.
+    """
+    if data_source is None:
+        data_source = createDataSource()
+
+    tweet_store = TweetStore.TweetStore(store_file_name)  # Instantiate TweetStore object.
+
+    # Resume after the newest stored tweet, or fetch from scratch if none are stored yet, then fill in any tweets
+    # earlier capped fetches did not reach.
+    since_id = tweet_store.latestTweetId(search_term)
+    fetch_gaps = tweet_store.fetchGaps(search_term)
+
+    if since_id is not None:
+        print("\nFetching tweets newer than stored tweet id: " + str(since_id))
+
+    # Store fetched tweets chunk_size at a time, already stored tweets are skipped.
+    new_tweet_amount = 0
+    fetched_tweet_amount = 0
+    tweet_chunk = []
+
+    for tweet in streamNewTweets(data_source, search_term, amount_of_observations, exclude_retweets, since_id,
+                                 fetch_gaps):
+        tweet_chunk.append(tweet)
+        fetched_tweet_amount += 1
+
+        if len(tweet_chunk) >= chunk_size:
+            new_tweet_amount += tweet_store.insertTweets(search_term, tweet_chunk)
+            tweet_chunk = []
+
+    new_tweet_amount += tweet_store.insertTweets(search_term, tweet_chunk)
+
+    tweet_store.storeFetchGaps(search_term, fetch_gaps)
+
+    print("Stored " + str(new_tweet_amount) + " new observations, " + str(tweet_store.tweetCount(search_term)) +
+          " stored in total.")
+
+    # Instantiate SentimentAnalysis object.
+    sentiment_analysis = SentimentAnalysis.SentimentAnalysis(workers, chunk_size, sentiment_cache, scorer)
+
+    print("\nProcessing Sentiment Analysis")
+
+    # Analyse the stored tweets that have no sentiment yet, chunk_size at a time.
+    unanalysed_tweets = tweet_store.unanalysedTweets(search_term, chunk_size)
+
+    while len(unanalysed_tweets) > 0:
+        tweet_ids = [tweet[0] for tweet in unanalysed_tweets]
+        sentiments = sentiment_analysis.analyseSentimentBatch(tweet[1] for tweet in unanalysed_tweets)
+
+        # Only newly analysed tweets are added, so the saved timeline counts each tweet once, including older tweets
+        # filled in below the highest id it has counted.
+        if timeline is not None:
+            for (tweet_id, text, created_at, favorite_count, retweet_count), sentiment in zip(unanalysed_tweets,
+                                                                                             sentiments):
+                timeline.add(created_at, sentiment, favorite_count, retweet_count, tweet_id, skip_counted=False)
+
+        tweet_store.storeSentiment(search_term, tweet_ids, sentiments)
+
+        unanalysed_tweets = tweet_store.unanalysedTweets(search_term, chunk_size)
+
+    sentiment_analysis.close()  # The same worker processes analysed every chunk.
+
+    sentiment_counts = tweet_store.sentimentCounts(search_term)
+    sentiment_analysis.displaySentimentCounts(sentiment_counts[1], sentiment_counts[0], sentiment_counts[-1])
+
+    if geo_sentiment is not None:
+        geo_sentiment.addCounts(*tweet_store.geoSentimentCounts(search_term, geo_sentiment.region))
+
+    if sentiment_cache is not None:
+        sentiment_cache.displayStatistics()  # Display how many tweets were already analysed.
+
+    # Write every stored tweet of the search term to the files, chunk_size tweets at a time.
+    file_generator = FileGenerator.FileGenerator()  # Instantiate FileGenerator object.
+
+    file_formats = appendableFileFormats(file_formats)
+
+    for file_format in file_formats:
+        print("Creating " + file_format + " file from store: " + file_generator.fileName(search_term, file_format))
+
+    tweet_chunk = []
+    start_file = True  # The files are started over by the first chunk and appended to by the rest.
+
+    for tweet in tweet_store.iterateTweets(search_term):
+        tweet_chunk.append(tweet)
+
+        if len(tweet_chunk) >= chunk_size:
+            file_generator.appendFiles(tweet_chunk, search_term, file_formats, start_file)
+            tweet_chunk = []
+            start_file = False
+
+    file_generator.appendFiles(tweet_chunk, search_term, file_formats, start_file)
+
+    # The store ranks the most favourited tweets itself, so only those are turned into a data frame and displayed.
+    top_tweets = tweet_store.topTweets(search_term, row_amount)
+
+    tweet_store.close()
+
+    displayTopTweets(top_tweets, row_amount)
+
+    return fetched_tweet_amount
 
 
 if __name__ == "__main__":